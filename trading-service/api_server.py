@@ -2,12 +2,14 @@
 HTTP API wrapper for the trading bot.
 Provides health checks and status endpoints.
 """
-from fastapi import FastAPI, HTTPException, Header, Depends, File, UploadFile, Form
+from fastapi import FastAPI, HTTPException, Header, Depends, File, UploadFile, Form, Query
 from pydantic import BaseModel
 from typing import Optional, List
 import uvicorn
 import threading
 import asyncio
+import json
+import traceback
 from datetime import datetime, timezone
 from pathlib import Path
 from config import Config
@@ -98,19 +100,23 @@ current_execution_id = None  # Track current bot execution record
 bot_logs = []
 MAX_LOG_LINES = 1000
 
+# Source mtime of each strategy module when it was imported, so rewritten uploads get reloaded
+_strategy_module_mtimes = {}
+
 def load_strategy(strategy_id: str):
     """
     Load trading strategy dynamically from file based on strategy_id
     Queries database to get strategy_file path and python_class name, 
     then dynamically imports and instantiates the strategy
     """
+    import importlib
     import importlib.util
     import sys
     from pathlib import Path
     
     try:
         # Get strategy details from database
-        db = StrategyDB()
+        db = StrategyDB.instance()
         strategy = db.get_strategy_by_id(strategy_id)
         
         if not strategy:
@@ -128,12 +134,27 @@ def load_strategy(strategy_id: str):
             logger.error(f"Strategy file not found: {strategy_file_path}")
             raise FileNotFoundError(f"Strategy file not found: {strategy_file_path}")
         
-        # Dynamically import the module
-        module_name = f"dynamic_strategy_{strategy_id.replace('-', '_')}"
-        spec = importlib.util.spec_from_file_location(module_name, strategy_file_path)
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
+        # Import through the strategies package so repeat loads reuse sys.modules;
+        # fall back to a file import for paths that are not valid module names
+        module_parts = Path(strategy.strategy_file).with_suffix('').parts
+        if all(part.isidentifier() for part in module_parts):
+            module_name = '.'.join(module_parts)
+            file_mtime = strategy_file_path.stat().st_mtime_ns
+            module = sys.modules.get(module_name)
+            if module is None:
+                # Path finders cache directory listings; pick up files uploaded at runtime
+                importlib.invalidate_caches()
+                module = importlib.import_module(module_name)
+            elif _strategy_module_mtimes.get(module_name) != file_mtime:
+                # The strategy file was rewritten since it was imported
+                module = importlib.reload(module)
+            _strategy_module_mtimes[module_name] = file_mtime
+        else:
+            module_name = f"dynamic_strategy_{strategy_id.replace('-', '_')}"
+            spec = importlib.util.spec_from_file_location(module_name, strategy_file_path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
         
         # Get the strategy class from the module
         strategy_class = getattr(module, strategy.python_class)
@@ -214,7 +235,6 @@ def get_available_balance(user_id: int = None) -> float:
         conn.close()
         
         if result and result[0]:
-            import json
             balance_data = result[0] if isinstance(result[0], dict) else json.loads(result[0])
             return float(balance_data.get('USDT', 10000.0))
         else:
@@ -248,8 +268,10 @@ def update_wallet_balance(user_id: int, currency: str, amount_change: float) ->
             conn.close()
             return False
         
-        import json
-        balance_data = result[0] if isinstance(result[0], dict) else json.loads(result[0])
+        # Connections stored before their first balance snapshot may have no balance yet
+        balance_data = result[0] or {}
+        if not isinstance(balance_data, dict):
+            balance_data = json.loads(balance_data)
         
         # Update balance
         current_balance = float(balance_data.get(currency, 0))
@@ -375,7 +397,6 @@ def run_bot_in_thread(strategy_id: str, capital_usdt: float = 100.0, bot_executi
             bot_status["strategy"] = None
     except Exception as e:
         print(f"Bot error: {str(e)}")
-        import traceback
         traceback.print_exc()
         bot_status["running"] = False
         bot_status["started_at"] = None
@@ -645,7 +666,7 @@ async def start_bot(
     global bot_thread, bot_status, current_execution_id
     
     # Validate that strategy exists and user has access to it
-    db_strategy = StrategyDB()
+    db_strategy = StrategyDB.instance()
     user_strategies = db_strategy.get_user_strategies(user_id)
     
     # Check if user has access to the requested strategy
@@ -733,7 +754,7 @@ async def start_bot(
         )
         db.add(execution)
         db.commit()
-        db.refresh(execution)
+        # id is populated by the INSERT itself; no refresh round trip needed
         current_execution_id = execution.id
         add_bot_log("INFO", f"Created bot execution record: ID={execution.id}, Capital: ${capital_usdt:,.2f} USDT", execution.id)
     except Exception as e:
@@ -838,9 +859,8 @@ async def get_strategies(user_id: int = Depends(get_current_user_id)):
     Includes default, created, and purchased strategies
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_user_strategies(user_id)
-        strategy_db.close()
         
         # Convert to dict for JSON response
         strategies_data = [strategy.to_dict() for strategy in strategies]
@@ -861,9 +881,8 @@ async def get_default_strategies():
     Public endpoint - no authentication required
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_default_strategies()
-        strategy_db.close()
         
         # Convert to dict for JSON response
         strategies_data = [strategy.to_dict() for strategy in strategies]
@@ -878,14 +897,17 @@ async def get_default_strategies():
         raise HTTPException(status_code=500, detail=f"Failed to fetch default strategies: {str(e)}")
 
 @app.get("/strategies/marketplace")
-async def get_marketplace_strategies():
+async def get_marketplace_strategies(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
     """
-    Get all marketplace strategies (available for purchase)
+    Get marketplace strategies (available for purchase)
+    Optional limit/offset query parameters page through the listing
     """
     try:
-        strategy_db = StrategyDB()
-        strategies = strategy_db.get_marketplace_strategies()
-        strategy_db.close()
+        strategy_db = StrategyDB.instance()
+        strategies = strategy_db.get_marketplace_strategies(limit=limit, offset=offset)
         
         # Convert to dict for JSON response
         strategies_data = [strategy.to_dict() for strategy in strategies]
@@ -905,9 +927,8 @@ async def get_strategy_details(strategy_id: str, user_id: int = Depends(get_curr
     Get details of a specific strategy
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategy = strategy_db.get_strategy_by_id(strategy_id)
-        strategy_db.close()
         
         if not strategy:
             raise HTTPException(status_code=404, detail=f"Strategy not found: {strategy_id}")
@@ -929,9 +950,8 @@ async def track_strategy_usage(strategy_id: str, user_id: int = Depends(get_curr
     Called when starting a bot with a strategy
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         success = strategy_db.track_strategy_usage(user_id, strategy_id)
-        strategy_db.close()
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to track strategy usage")
@@ -955,9 +975,8 @@ async def get_user_strategies_admin(
     """Admin view: all strategies for a given user with bot status."""
     db = get_db()
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_user_imported_strategies(target_user_id)
-        strategy_db.close()
 
         # Get latest bot execution per strategy name for this user
         bots = db.query(BotExecution).filter(
@@ -1013,7 +1032,7 @@ async def upload_strategy(
     try:
         # Initialize handlers
         upload_handler = StrategyUploadHandler()
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         
         # Read file content
         file_content = await file.read()
@@ -1070,7 +1089,6 @@ async def upload_strategy(
             upload_handler.delete_strategy_file(file_path)
             raise HTTPException(status_code=500, detail=f"Failed to create strategy: {error_msg}")
         
-        strategy_db.close()
         
         logger.info(f"Strategy uploaded successfully: {strategy_id}")
         
@@ -1106,9 +1124,8 @@ async def get_all_strategies_admin(
         strategy_type: Optional filter ('default', 'marketplace', 'user_created')
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_all_strategies_admin(strategy_type)
-        strategy_db.close()
         
         # Convert to dict for JSON response
         strategies_data = [strategy.to_dict() for strategy in strategies]
@@ -1136,7 +1153,7 @@ async def update_strategy(
     Does not update the strategy file
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         
         success, error_msg = strategy_db.update_strategy(
             strategy_id=strategy_id,
@@ -1145,7 +1162,6 @@ async def update_strategy(
             price=price
         )
         
-        strategy_db.close()
         
         if not success:
             raise HTTPException(status_code=400, detail=error_msg)
@@ -1172,7 +1188,7 @@ async def delete_strategy(
     Deletes both database record and file
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         upload_handler = StrategyUploadHandler()
         
         # Get strategy details to find file path
@@ -1189,7 +1205,6 @@ async def delete_strategy(
         if strategy.strategy_file:
             upload_handler.delete_strategy_file(strategy.strategy_file)
         
-        strategy_db.close()
         
         return {
             "status": "success",
@@ -1212,7 +1227,7 @@ async def get_strategy_content(
     Get the Python file content of a strategy (Admin only)
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         upload_handler = StrategyUploadHandler()
         
         # Get strategy details
@@ -1228,7 +1243,6 @@ async def get_strategy_content(
         if content is None:
             raise HTTPException(status_code=404, detail="Could not read strategy file")
         
-        strategy_db.close()
         
         return {
             "status": "success",
@@ -1265,7 +1279,7 @@ async def user_upload_strategy(
     """
     try:
         upload_handler = StrategyUploadHandler()
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
 
         # Enforce import limit for free users
         FREE_IMPORT_LIMIT = 2
@@ -1317,7 +1331,6 @@ async def user_upload_strategy(
             upload_handler.delete_strategy_file(file_path)
             raise HTTPException(status_code=500, detail=f"Failed to create strategy: {error_msg}")
 
-        strategy_db.close()
         logger.info(f"User {user_id} uploaded strategy: {strategy_id}")
 
         return {
@@ -1345,9 +1358,8 @@ async def get_user_imported_strategies(
 ):
     """Get all strategies imported/created by the current user."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_user_imported_strategies(user_id)
-        strategy_db.close()
         return {
             "status": "success",
             "data": [s.to_dict() for s in strategies]
@@ -1364,7 +1376,7 @@ async def delete_user_strategy(
 ):
     """Delete a user's own imported strategy (private, rejected, or approved — not pending_review)."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategy = strategy_db.get_strategy_by_id(strategy_id)
 
         if not strategy:
@@ -1381,7 +1393,6 @@ async def delete_user_strategy(
         if strategy.strategy_file:
             upload_handler.delete_strategy_file(strategy.strategy_file)
 
-        strategy_db.close()
         return {"status": "success", "message": "Strategy deleted"}
 
     except HTTPException:
@@ -1398,7 +1409,7 @@ async def get_user_strategy_content(
 ):
     """Get the file content of a user's own strategy."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategy = strategy_db.get_strategy_by_id(strategy_id)
 
         if not strategy:
@@ -1411,7 +1422,6 @@ async def get_user_strategy_content(
         if content is None:
             raise HTTPException(status_code=404, detail="Strategy file not found")
 
-        strategy_db.close()
         return {"status": "success", "data": {"content": content}}
 
     except HTTPException:
@@ -1431,18 +1441,16 @@ async def request_publish_strategy(
     Sets publish_status = 'pending_review'. Admin must approve/reject.
     """
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
 
         # Block publish request for free users
         if not strategy_db.is_user_subscribed(user_id):
-            strategy_db.close()
             raise HTTPException(
                 status_code=402,
                 detail="SUBSCRIPTION_REQUIRED: Only Pro subscribers can request to publish strategies."
             )
 
         success, error_msg = strategy_db.request_publish_strategy(strategy_id, user_id, price)
-        strategy_db.close()
 
         if not success:
             raise HTTPException(status_code=400, detail=error_msg)
@@ -1467,9 +1475,8 @@ async def get_pending_review_strategies(
 ):
     """Get all user strategies pending admin review."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_pending_review_strategies()
-        strategy_db.close()
         return {
             "status": "success",
             "data": [s.to_dict() for s in strategies],
@@ -1489,9 +1496,8 @@ async def download_strategy_file(
     import os as _os
 
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategy = strategy_db.get_strategy_by_id(strategy_id)
-        strategy_db.close()
 
         if not strategy:
             raise HTTPException(status_code=404, detail="Strategy not found")
@@ -1523,9 +1529,8 @@ async def approve_strategy(
 ):
     """Admin approves a pending strategy — publishes it to marketplace."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         success, error_msg = strategy_db.approve_strategy(strategy_id)
-        strategy_db.close()
 
         if not success:
             raise HTTPException(status_code=400, detail=error_msg)
@@ -1545,9 +1550,8 @@ async def reject_strategy(
 ):
     """Admin rejects a pending strategy with a reason."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         success, error_msg = strategy_db.reject_strategy(strategy_id, reason)
-        strategy_db.close()
 
         if not success:
             raise HTTPException(status_code=400, detail=error_msg)
@@ -1565,9 +1569,8 @@ async def get_all_user_marketplace_strategies(
 ):
     """Admin view: all user-submitted strategies approved in the marketplace."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_all_user_marketplace_strategies()
-        strategy_db.close()
         return {
             "status": "success",
             "data": strategies,
@@ -1584,9 +1587,8 @@ async def get_user_marketplace_strategies(
 ):
     """Admin view: get strategies a user has published to the marketplace."""
     try:
-        strategy_db = StrategyDB()
+        strategy_db = StrategyDB.instance()
         strategies = strategy_db.get_user_marketplace_strategies_admin(user_id)
-        strategy_db.close()
         return {
             "status": "success",
             "data": [s.to_dict() for s in strategies],
@@ -269,9 +269,10 @@ class TradingBot:
         Returns:
             Number of positions closed
         """
-        from bot_models import Position, get_db
+        from bot_models import ASYNC_COMMIT, Position, get_db
         
         positions_closed = 0
+        prices_updated = False
         db = get_db()
         
         try:
@@ -346,10 +347,13 @@ class TradingBot:
                             self.logger.info(f"✅ Position closed via take profit")
                     
                     else:
-                        # Update current_price in database for live tracking
-                        position.current_price = current_price
-                        position.unrealized_pnl = current_pnl
-                        db.commit()
+                        # Update current_price in database for live tracking; each row is
+                        # flushed in its own savepoint so a stale or concurrently closed
+                        # position only loses its own update (committed once after the loop)
+                        with db.begin_nested():
+                            position.current_price = current_price
+                            position.unrealized_pnl = current_pnl
+                        prices_updated = True
                         
                         # Log current position status
                         self.logger.info(
@@ -362,6 +366,14 @@ class TradingBot:
                     self.logger.error(f"Error monitoring position {symbol}: {str(e)}")
                     continue
             
+            # Only live prices are written here; sells go through the signal processor
+            try:
+                if prices_updated:
+                    db.execute(ASYNC_COMMIT)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.logger.error(f"Error saving position prices: {str(e)}")
             return positions_closed
         
         finally:
@@ -372,6 +384,9 @@ class TradingBot:
         self.logger.info("\nStopping trading bot...")
         self.running = False
         
+        if self.signal_processor and self.signal_processor.trading_manager:
+            self.signal_processor.trading_manager.close()
+        
         if self.exchange_manager:
             self.exchange_manager.close()
         
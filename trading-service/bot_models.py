@@ -1,9 +1,10 @@
 """
 Database models for trading bot execution tracking.
 """
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool
 from datetime import datetime, timezone
 import os
 
@@ -53,6 +54,10 @@ class BotExecution(Base):
 class Order(Base):
     """Track pending and executed orders."""
     __tablename__ = "orders"
+    __table_args__ = (
+        # Pending-orders listing filters by user and status, newest first
+        Index("ix_orders_user_status_created", "user_id", "status", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     bot_execution_id = Column(Integer, ForeignKey('bot_executions.id'), nullable=False)
@@ -64,6 +69,7 @@ class Order(Base):
     price = Column(Float)  # Order price (for limit orders)
     quantity = Column(Float, nullable=False)  # Amount
     filled_quantity = Column(Float, default=0.0)  # Amount filled
+    average_price = Column(Float)  # Volume-weighted fill price
     status = Column(String(20), nullable=False)  # PENDING / FILLED / CANCELLED / FAILED
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     filled_at = Column(DateTime)
@@ -90,6 +96,10 @@ class Order(Base):
 class Position(Base):
     """Track open positions."""
     __tablename__ = "positions"
+    __table_args__ = (
+        # One open position per user and symbol; target of the upsert in TradingManager
+        Index("uq_positions_user_symbol", "user_id", "symbol", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     bot_execution_id = Column(Integer, ForeignKey('bot_executions.id'), nullable=False)
@@ -153,13 +163,41 @@ class TradeHistory(Base):
             "closed_at": self.closed_at.isoformat() if self.closed_at else None
         }
 
-# Create engine and session
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create engine and session (one pool shared by the API server, bot and trading manager)
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=QueuePool,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "25")),        # Connections kept open
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "25")),  # Extra connections under bursts
+    pool_timeout=30,       # Seconds to wait for a free connection
+    pool_pre_ping=True,    # Verify connections before use
+    pool_recycle=300,      # Recreate connections every 5 minutes
+    pool_use_lifo=True     # Reuse the most recent connection so idle ones can expire
+)
+# Keep loaded attributes after commit; callers log/return values they just wrote
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Mark-to-market prices are recomputed every cycle, so their commits need not wait
+# for the WAL flush. Only use it in transactions where losing the last few commits
+# on a database crash is acceptable (the next cycle rewrites them); never for orders
+ASYNC_COMMIT = text("SET LOCAL synchronous_commit TO OFF")
 
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    # create_all skips columns and indexes on tables that already exist
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS average_price DOUBLE PRECISION"))
+    for index in Order.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    # The position upsert needs this index; merging existing duplicates rewrites user
+    # data, so it is left to migrations/005_unique_positions_user_symbol.sql
+    with engine.connect() as conn:
+        if not engine.dialect.has_index(conn, Position.__tablename__, "uq_positions_user_symbol"):
+            raise RuntimeError(
+                "positions is missing the uq_positions_user_symbol index; run "
+                "migrations/005_unique_positions_user_symbol.sql against the trading database"
+            )
 
 def get_db():
     """Get database session."""
@@ -5,6 +5,8 @@ Supports simulation mode for demo purposes without API keys.
 """
 import ccxt
 import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from logger import setup_logger
@@ -91,13 +93,11 @@ class ExchangeManager:
                 }
             })
             
-            # Test Mainnet connection
+            # Test Mainnet connection in the background while the trading connection is set up
             self.logger.info("🔄 Testing Binance Mainnet connection (public data)...")
-            try:
-                mainnet_status = self.mainnet.fetch_status()
-                self.logger.info(f"✅ Binance Mainnet connected (public): {mainnet_status['status']}")
-            except Exception as e:
-                self.logger.warning(f"⚠️  Mainnet test failed, but continuing: {str(e)}")
+            status_probe = ThreadPoolExecutor(max_workers=1)
+            mainnet_status = status_probe.submit(self.mainnet.fetch_status)
+            status_probe.shutdown(wait=False)
             
             # Initialize Binance for orders (testnet or production based on environment)
             is_sandbox = self.environment.lower() == "testnet"
@@ -138,6 +138,11 @@ class ExchangeManager:
             self.logger.info(f"   Used: ${usdt_balance.get('used', 0):,.2f}")
             self.logger.info(f"   Total: ${usdt_balance.get('total', 0):,.2f}")
             
+            try:
+                self.logger.info(f"✅ Binance Mainnet connected (public): {mainnet_status.result()['status']}")
+            except Exception as e:
+                self.logger.warning(f"⚠️  Mainnet test failed, but continuing: {str(e)}")
+            
             return True
             
         except Exception as e:
@@ -201,7 +206,6 @@ class ExchangeManager:
                 self.logger.debug(f"After strip - API Key length: {len(api_key)}")
             except Exception as decrypt_error:
                 self.logger.error(f"Failed to decrypt credentials: {decrypt_error}")
-                import traceback
                 self.logger.error(traceback.format_exc())
                 return None, None
             
@@ -215,7 +219,6 @@ class ExchangeManager:
             
         except Exception as e:
             self.logger.error(f"Failed to fetch credentials from wallet database: {e}")
-            import traceback
             self.logger.error(traceback.format_exc())
             return None, None
     
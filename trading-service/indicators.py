@@ -9,6 +9,10 @@ from logger import setup_logger
 from config import Config
 
 
+# MACD state indexed by sign of (macd - signal): 0 -> flat, 1 -> above, -1 -> below
+_MACD_STATE_BY_SIGN = ("NEUTRAL", "BULLISH", "BEARISH")
+
+
 class TechnicalIndicators:
     """
     Calculate technical indicators for trading analysis.
@@ -84,7 +88,8 @@ class TechnicalIndicators:
             signal: Signal line period
         
         Returns:
-            DataFrame with 'macd', 'macd_signal', 'macd_histogram' columns
+            DataFrame with 'macd', 'macd_signal', 'macd_histogram',
+            'macd_cross_up', 'macd_cross_down' columns
         """
         df = df.copy()
         macd = ta.macd(df['close'], fast=fast, slow=slow, signal=signal)
@@ -93,6 +98,13 @@ class TechnicalIndicators:
             df['macd'] = macd[f'MACD_{fast}_{slow}_{signal}']
             df['macd_signal'] = macd[f'MACDs_{fast}_{slow}_{signal}']
             df['macd_histogram'] = macd[f'MACDh_{fast}_{slow}_{signal}']
+            
+            # Precompute crossover flags once so strategies read a single boolean
+            # (NaN comparisons evaluate to False, so warm-up rows never cross)
+            prev_macd = df['macd'].shift(1)
+            prev_signal = df['macd_signal'].shift(1)
+            df['macd_cross_up'] = (prev_macd <= prev_signal) & (df['macd'] > df['macd_signal'])
+            df['macd_cross_down'] = (prev_macd >= prev_signal) & (df['macd'] < df['macd_signal'])
         
         return df
     
@@ -312,27 +324,22 @@ class TechnicalIndicators:
         if len(df) < 2:
             return "UNKNOWN"
         
-        current = df.iloc[-1]
-        previous = df.iloc[-2]
+        macd = df['macd'].to_numpy()
+        macd_signal = df['macd_signal'].to_numpy()
         
-        if pd.isna(current['macd']) or pd.isna(current['macd_signal']):
+        # Compute each MACD - signal spread once and compare against zero
+        diff_cur = float(macd[-1] - macd_signal[-1])
+        if pd.isna(diff_cur):
             return "UNKNOWN"
+        diff_prev = float(macd[-2] - macd_signal[-2])
         
         # Bullish crossover: MACD crosses above signal
-        if previous['macd'] <= previous['macd_signal'] and current['macd'] > current['macd_signal']:
+        if diff_prev <= 0 < diff_cur:
             return "BULLISH_CROSS"
         
         # Bearish crossover: MACD crosses below signal
-        elif previous['macd'] >= previous['macd_signal'] and current['macd'] < current['macd_signal']:
+        if diff_prev >= 0 > diff_cur:
             return "BEARISH_CROSS"
         
-        # Currently bullish
-        elif current['macd'] > current['macd_signal']:
-            return "BULLISH"
-        
-        # Currently bearish
-        elif current['macd'] < current['macd_signal']:
-            return "BEARISH"
-        
-        else:
-            return "NEUTRAL"
+        # Currently bullish / bearish / flat, indexed by the sign of the spread
+        return _MACD_STATE_BY_SIGN[(diff_cur > 0) - (diff_cur < 0)]
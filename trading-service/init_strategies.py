@@ -6,6 +6,7 @@ Creates tables and inserts default strategies
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
+import traceback
 # from dotenv import load_dotenv
 
 # # Load environment variables
@@ -102,7 +103,6 @@ def init_strategies_db():
         
     except Exception as e:
         print(f"\n❌ Error initializing database: {e}")
-        import traceback
         traceback.print_exc()
         raise
 
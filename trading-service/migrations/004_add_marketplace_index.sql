@@ -0,0 +1,7 @@
+-- Migration: Add partial index for the marketplace listing
+-- Description: Lets get_marketplace_strategies walk the index in
+--              (total_purchases DESC, name) order and stop at LIMIT instead of sorting
+
+CREATE INDEX IF NOT EXISTS idx_strategies_marketplace
+ON strategies (total_purchases DESC, name)
+WHERE type = 'marketplace' AND created_by = 'admin';
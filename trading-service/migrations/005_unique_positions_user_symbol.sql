@@ -0,0 +1,37 @@
+-- Migration: Enforce one open position per user and symbol
+-- Database: trading database (positions table), not the auth database, e.g.
+--           psql "$TRADING_DATABASE_URL" -f migrations/005_unique_positions_user_symbol.sql
+--           Does nothing on a database without a positions table.
+-- Description: TradingManager opens positions with INSERT ... ON CONFLICT (user_id, symbol),
+--              which needs a unique index. Older schemas allowed several rows per user and
+--              symbol; they are folded into the newest row (summed quantity, quantity-weighted
+--              entry price, the same math as the upsert) and the other rows are deleted.
+--              Back up the positions table before running it.
+
+DO $$
+BEGIN
+    IF to_regclass('public.positions') IS NULL THEN
+        RETURN;
+    END IF;
+
+    WITH merged AS (
+        SELECT user_id, symbol, MAX(id) AS keep_id,
+               SUM(entry_price * quantity) / NULLIF(SUM(quantity), 0) AS entry_price,
+               SUM(quantity) AS quantity
+        FROM positions
+        GROUP BY user_id, symbol
+        HAVING COUNT(*) > 1
+    ), kept AS (
+        UPDATE positions p
+        SET entry_price = COALESCE(m.entry_price, p.entry_price),
+            quantity = m.quantity
+        FROM merged m
+        WHERE p.id = m.keep_id
+        RETURNING p.id
+    )
+    DELETE FROM positions p
+    USING merged m
+    WHERE p.user_id = m.user_id AND p.symbol = m.symbol AND p.id <> m.keep_id;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_positions_user_symbol ON positions (user_id, symbol);
+END $$;
@@ -167,23 +167,33 @@ class SignalProcessor:
             if order:
                 # Track order in database if trading manager is available
                 if self.trading_manager:
-                    order_id = self.trading_manager.create_order(
-                        symbol=symbol,
-                        side=side.upper(),
-                        order_type="MARKET",
-                        quantity=order_size,
-                        price=signal.entry_price
-                    )
-                    # Immediately fill the order (for simulation/market orders)
-                    if order_id:
-                        self.trading_manager.fill_order(
-                            order_id,
-                            filled_price=order.get('price', signal.entry_price),
-                            stop_loss=signal.stop_loss if side == 'buy' else None,
-                            take_profit=signal.take_profit if side == 'buy' else None
+                    try:
+                        # Record, fill and timestamp the order in a single transaction
+                        with self.trading_manager.tick():
+                            order_id = self.trading_manager.create_order(
+                                symbol=symbol,
+                                side=side.upper(),
+                                order_type="MARKET",
+                                quantity=order_size,
+                                price=signal.entry_price
+                            )
+                            # Immediately fill the order (for simulation/market orders)
+                            if order_id:
+                                self.trading_manager.fill_order(
+                                    order_id,
+                                    filled_price=order.get('price', signal.entry_price),
+                                    stop_loss=signal.stop_loss if side == 'buy' else None,
+                                    take_profit=signal.take_profit if side == 'buy' else None
+                                )
+                                # Update last run timestamp
+                                self.trading_manager.update_bot_last_run()
+                    except Exception as e:
+                        # The exchange order already executed; surface the failed
+                        # bookkeeping instead of reporting a clean run
+                        self.logger.error(
+                            f"❌ {symbol} order {order.get('id')} executed on the exchange "
+                            f"but could not be recorded: {e}"
                         )
-                        # Update last run timestamp
-                        self.trading_manager.update_bot_last_run()
                 
                 # Update position tracking
                 self._update_position(symbol, signal, order)
@@ -338,13 +348,23 @@ class SignalProcessor:
         if signal.entry_price:
             self.logger.info(f"   Entry Price:  ${signal.entry_price:,.2f}")
         
+        # One division shared by the stop loss and take profit percentages;
+        # without an entry price the levels are logged without a percentage
+        pct_scale = 100.0 / signal.entry_price if signal.entry_price else None
+        
         if signal.stop_loss:
-            loss_pct = ((signal.stop_loss - signal.entry_price) / signal.entry_price * 100)
-            self.logger.info(f"   Stop Loss:    ${signal.stop_loss:,.2f} ({loss_pct:+.2f}%)")
+            if pct_scale:
+                loss_pct = (signal.stop_loss - signal.entry_price) * pct_scale
+                self.logger.info(f"   Stop Loss:    ${signal.stop_loss:,.2f} ({loss_pct:+.2f}%)")
+            else:
+                self.logger.info(f"   Stop Loss:    ${signal.stop_loss:,.2f}")
         
         if signal.take_profit:
-            profit_pct = ((signal.take_profit - signal.entry_price) / signal.entry_price * 100)
-            self.logger.info(f"   Take Profit:  ${signal.take_profit:,.2f} ({profit_pct:+.2f}%)")
+            if pct_scale:
+                profit_pct = (signal.take_profit - signal.entry_price) * pct_scale
+                self.logger.info(f"   Take Profit:  ${signal.take_profit:,.2f} ({profit_pct:+.2f}%)")
+            else:
+                self.logger.info(f"   Take Profit:  ${signal.take_profit:,.2f}")
         
         self.logger.info(f"{'='*70}\n")
     
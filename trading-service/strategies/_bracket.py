@@ -0,0 +1,35 @@
+"""
+Shared stop loss / take profit bracket calculation for strategies.
+"""
+from typing import Optional, Tuple
+from strategies.base_strategy import SignalType
+
+_BUY = SignalType.BUY
+_SELL = SignalType.SELL
+
+
+def bracket(
+    price: float,
+    signal: SignalType,
+    sl_pct: float,
+    tp_pct: float
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Calculate stop loss and take profit levels for a signal.
+
+    Args:
+        price: Entry price
+        signal: Signal type the bracket is built for
+        sl_pct: Stop loss distance as a fraction (e.g., 0.03 for 3%)
+        tp_pct: Take profit distance as a fraction (e.g., 0.06 for 6%)
+
+    Returns:
+        Tuple of (stop_loss, take_profit); (None, None) for HOLD
+    """
+    if signal is _BUY:
+        price = float(price)
+        return price * (1 - sl_pct), price * (1 + tp_pct)
+    if signal is _SELL:
+        price = float(price)
+        return price * (1 + sl_pct), price * (1 - tp_pct)
+    return None, None
@@ -7,12 +7,9 @@ from typing import Dict, Optional
 from dataclasses import dataclass
 import pandas as pd
 from enum import Enum
-import sys
-from pathlib import Path
 
 # Import Config if available (for fallback timeframes)
 try:
-    sys.path.insert(0, str(Path(__file__).parent.parent))
     from config import Config
 except ImportError:
     Config = None
@@ -55,6 +52,20 @@ class TradingSignal:
         )
 
 
+# Shared HOLD signals for the early exits every strategy has; instances are
+# reused across calls, so callers must treat them as read-only
+HOLD_INSUFFICIENT_DATA = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Insufficient data for analysis"
+)
+HOLD_INDICATORS_UNAVAILABLE = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Indicator values not available"
+)
+
+
 class BaseStrategy(ABC):
     """
     Abstract base class for trading strategies.
@@ -133,7 +144,7 @@ class BaseStrategy(ABC):
             return False
         
         for timeframe, df in data.items():
-            if df is None or df.empty:
+            if df is None or df.shape[0] == 0:
                 return False
         
         return True
@@ -5,7 +5,30 @@ Trend-following strategy using MACD crossovers with momentum confirmation
 
 import pandas as pd
 from typing import Dict
-from strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
+from strategies.base_strategy import (
+    BaseStrategy, TradingSignal, SignalType,
+    HOLD_INSUFFICIENT_DATA, HOLD_INDICATORS_UNAVAILABLE
+)
+from strategies._bracket import bracket
+
+# Reason templates parsed once at import; bound .format avoids a new f-string per tick
+_REASON_BULLISH = "MACD bullish: {:.2f} > {:.2f}".format
+_REASON_BEARISH = "MACD bearish: {:.2f} < {:.2f}".format
+_REASON_ABOVE_EMA = "Price above EMA20: ${:.2f} > ${:.2f}".format
+_REASON_BELOW_EMA = "Price below EMA20: ${:.2f} < ${:.2f}".format
+_REASON_NEUTRAL = "MACD: {:.2f} | Signal: {:.2f} | Hist: {:.4f}".format
+
+# Early-exit HOLD signals are shared instances; treat them as read-only
+_HOLD_NO_TIMEFRAME = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Required timeframe data not available"
+)
+_HOLD_INSUFFICIENT_CANDLES = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Insufficient data"
+)
 
 
 class MACDMomentumStrategy(BaseStrategy):
@@ -53,28 +76,16 @@ class MACDMomentumStrategy(BaseStrategy):
             TradingSignal object with signal type, confidence, and reason
         """
         if not self.validate_data(data):
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Insufficient data for analysis"
-            )
+            return HOLD_INSUFFICIENT_DATA
         
         # Get data for primary timeframe
         if self.timeframe not in data:
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Required timeframe data not available"
-            )
+            return _HOLD_NO_TIMEFRAME
         
-        df = data[self.timeframe].copy()
+        df = data[self.timeframe]
         
-        if len(df) < 50:
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Insufficient data"
-            )
+        if df.shape[0] < 50:
+            return _HOLD_INSUFFICIENT_CANDLES
         
         # Get latest values (use current_price parameter instead of dataframe)
         macd = df['macd'].iloc[-1]
@@ -83,15 +94,16 @@ class MACDMomentumStrategy(BaseStrategy):
         prev_macd_hist = df['macd_histogram'].iloc[-2]
         ema_20 = df['ema_20'].iloc[-1]
         volume = df['volume'].iloc[-1]
-        avg_volume = df['volume'].rolling(20).mean().iloc[-1]
+        # Reuse the precomputed 20-period volume SMA; otherwise average only the
+        # last 20 candles instead of rolling over the whole frame
+        if 'volume_sma' in df.columns:
+            avg_volume = df['volume_sma'].iloc[-1]
+        else:
+            avg_volume = df['volume'].iloc[-20:].mean()
         
         # Check for NaN values
         if any(pd.isna([macd, macd_signal, macd_hist, ema_20])):
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Indicator values not available"
-            )
+            return HOLD_INDICATORS_UNAVAILABLE
         
         # Calculate signal components
         signal_type = SignalType.HOLD
@@ -116,7 +128,7 @@ class MACDMomentumStrategy(BaseStrategy):
         # BUY SIGNAL CONDITIONS
         if macd_bullish and macd_hist > 0:
             confidence = 50
-            reasons.append(f"MACD bullish: {macd:.2f} > {macd_signal:.2f}")
+            reasons.append(_REASON_BULLISH(macd, macd_signal))
             
             if hist_increasing:
                 confidence += 15
@@ -124,7 +136,7 @@ class MACDMomentumStrategy(BaseStrategy):
             
             if price_above_ema:
                 confidence += 15
-                reasons.append(f"Price above EMA20: ${current_price:.2f} > ${ema_20:.2f}")
+                reasons.append(_REASON_ABOVE_EMA(current_price, ema_20))
             
             if high_volume:
                 confidence += 10
@@ -136,7 +148,7 @@ class MACDMomentumStrategy(BaseStrategy):
         # SELL SIGNAL CONDITIONS
         elif macd_bearish and macd_hist < 0:
             confidence = 50
-            reasons.append(f"MACD bearish: {macd:.2f} < {macd_signal:.2f}")
+            reasons.append(_REASON_BEARISH(macd, macd_signal))
             
             if hist_decreasing:
                 confidence += 15
@@ -144,7 +156,7 @@ class MACDMomentumStrategy(BaseStrategy):
             
             if price_below_ema:
                 confidence += 15
-                reasons.append(f"Price below EMA20: ${current_price:.2f} < ${ema_20:.2f}")
+                reasons.append(_REASON_BELOW_EMA(current_price, ema_20))
             
             if high_volume:
                 confidence += 10
@@ -155,19 +167,14 @@ class MACDMomentumStrategy(BaseStrategy):
         
         # HOLD CONDITION
         else:
-            reasons.append(f"MACD: {macd:.2f} | Signal: {macd_signal:.2f} | Hist: {macd_hist:.4f}")
+            reasons.append(_REASON_NEUTRAL(macd, macd_signal, macd_hist))
             reasons.append("No clear momentum signal")
         
         # Calculate stop loss and take profit
-        stop_loss = None
-        take_profit = None
-        
-        if signal_type == SignalType.BUY:
-            stop_loss = float(current_price * (1 - self.stop_loss_pct / 100))
-            take_profit = float(current_price * (1 + self.take_profit_pct / 100))
-        elif signal_type == SignalType.SELL:
-            stop_loss = float(current_price * (1 + self.stop_loss_pct / 100))
-            take_profit = float(current_price * (1 - self.take_profit_pct / 100))
+        stop_loss, take_profit = bracket(
+            current_price, signal_type,
+            self.stop_loss_pct / 100, self.take_profit_pct / 100
+        )
         
         return TradingSignal(
             signal=signal_type,
@@ -18,11 +18,38 @@ Sell Conditions:
 3. MACD showing signs of reversal
 4. Not in strong uptrend
 """
-from strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
+from strategies.base_strategy import (
+    BaseStrategy, TradingSignal, SignalType,
+    HOLD_INSUFFICIENT_DATA, HOLD_INDICATORS_UNAVAILABLE
+)
+from strategies._bracket import bracket
 from typing import Dict
 import pandas as pd
 from config import Config
 
+# Reason templates parsed once at import; bound .format avoids a new f-string per tick
+_REASON_OVERSOLD = "RSI oversold: {:.1f}".format
+_REASON_OVERBOUGHT = "RSI overbought: {:.1f}".format
+_REASON_NEUTRAL = "RSI neutral: {:.1f}".format
+_REASON_BB_POSITION = "BB position: {:.1f}%".format
+
+# Early-exit HOLD signals are shared instances; treat them as read-only
+_HOLD_NO_TIMEFRAME = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Primary timeframe not available"
+)
+_HOLD_INSUFFICIENT_CANDLES = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Insufficient candles for analysis"
+)
+_HOLD_NO_INDICATORS = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Required indicators not calculated"
+)
+
 
 class RSIMeanReversionStrategy(BaseStrategy):
     """
@@ -53,41 +80,23 @@ class RSIMeanReversionStrategy(BaseStrategy):
         """Analyze market data for mean reversion opportunities."""
         
         if not self.validate_data(data):
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Insufficient data for analysis"
-            )
+            return HOLD_INSUFFICIENT_DATA
         
         # Use primary timeframe (1h or highest available)
         primary_tf = self._get_primary_timeframe(data)
         if not primary_tf:
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Primary timeframe not available"
-            )
+            return _HOLD_NO_TIMEFRAME
         
         df = data[primary_tf]
         
         # Require minimum data
-        if len(df) < 50:
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Insufficient candles for analysis"
-            )
-        
-        latest = df.iloc[-1]
+        if df.shape[0] < 50:
+            return _HOLD_INSUFFICIENT_CANDLES
         
         # Check required indicators
         required_indicators = ['rsi', 'bb_upper', 'bb_lower', 'bb_middle']
         if not all(ind in df.columns for ind in required_indicators):
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Required indicators not calculated"
-            )
+            return _HOLD_NO_INDICATORS
         
         # Analyze conditions
         return self._generate_signal(df, current_price, symbol)
@@ -107,33 +116,41 @@ class RSIMeanReversionStrategy(BaseStrategy):
     ) -> TradingSignal:
         """Generate trading signal based on mean reversion logic."""
         
-        latest = df.iloc[-1]
-        previous = df.iloc[-2] if len(df) > 1 else latest
-        
         reasons = []
         confidence = 0
         signal_type = SignalType.HOLD
         
-        rsi = latest['rsi']
-        bb_upper = latest['bb_upper']
-        bb_lower = latest['bb_lower']
-        bb_middle = latest['bb_middle']
-        price = latest['close']
+        # Read only the tail values needed from each column (no row Series construction)
+        cols = df.columns
+        rsi_arr = df['rsi'].to_numpy()
+        rsi = rsi_arr[-1]
+        # prev_rsi equals rsi for a single row, so the recovery/decline checks stay False
+        prev_rsi = rsi_arr[-2] if rsi_arr.shape[0] > 1 else rsi
+        bb_upper = df['bb_upper'].to_numpy()[-1]
+        bb_lower = df['bb_lower'].to_numpy()[-1]
+        bb_middle = df['bb_middle'].to_numpy()[-1]
+        price = df['close'].to_numpy()[-1]
+        
+        has_macd = 'macd' in cols and 'macd_signal' in cols
+        if has_macd:
+            macd = df['macd'].to_numpy()[-1]
+            macd_signal = df['macd_signal'].to_numpy()[-1]
+        
+        has_ema = 'ema_20' in cols and 'ema_50' in cols
+        if has_ema:
+            ema_20 = df['ema_20'].to_numpy()[-1]
+            ema_50 = df['ema_50'].to_numpy()[-1]
         
         # Check for NaN values
         if any(pd.isna([rsi, bb_upper, bb_lower, price])):
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Indicator values not available"
-            )
+            return HOLD_INDICATORS_UNAVAILABLE
         
         # Calculate distance from Bollinger Bands
         bb_position = (price - bb_lower) / (bb_upper - bb_lower) * 100
         
         # BUY Logic (Oversold conditions)
         if rsi < self.rsi_buy_threshold:
-            reasons.append(f"RSI oversold: {rsi:.1f}")
+            reasons.append(_REASON_OVERSOLD(rsi))
             confidence += 35
             
             if price < bb_lower:
@@ -144,21 +161,21 @@ class RSIMeanReversionStrategy(BaseStrategy):
                 confidence += 15
             
             # Check if RSI is recovering
-            if len(df) > 1 and previous['rsi'] < rsi:
+            if prev_rsi < rsi:
                 reasons.append("RSI recovering")
                 confidence += 15
             
             # MACD confirmation
-            if 'macd' in df.columns and 'macd_signal' in df.columns:
-                if not pd.isna(latest['macd']) and not pd.isna(latest['macd_signal']):
-                    if latest['macd'] > latest['macd_signal']:
+            if has_macd:
+                if not pd.isna(macd) and not pd.isna(macd_signal):
+                    if macd > macd_signal:
                         reasons.append("MACD bullish")
                         confidence += 15
             
             # Check trend - avoid buying in strong downtrend
-            if 'ema_20' in df.columns and 'ema_50' in df.columns:
-                if not pd.isna(latest['ema_20']) and not pd.isna(latest['ema_50']):
-                    if latest['ema_20'] < latest['ema_50']:
+            if has_ema:
+                if not pd.isna(ema_20) and not pd.isna(ema_50):
+                    if ema_20 < ema_50:
                         confidence -= 20
                         reasons.append("Warning: Downtrend")
             
@@ -169,7 +186,7 @@ class RSIMeanReversionStrategy(BaseStrategy):
         
         # SELL Logic (Overbought conditions)
         elif rsi > self.rsi_sell_threshold:
-            reasons.append(f"RSI overbought: {rsi:.1f}")
+            reasons.append(_REASON_OVERBOUGHT(rsi))
             confidence += 35
             
             if price > bb_upper:
@@ -180,21 +197,21 @@ class RSIMeanReversionStrategy(BaseStrategy):
                 confidence += 15
             
             # Check if RSI is declining
-            if len(df) > 1 and previous['rsi'] > rsi:
+            if prev_rsi > rsi:
                 reasons.append("RSI declining")
                 confidence += 15
             
             # MACD confirmation
-            if 'macd' in df.columns and 'macd_signal' in df.columns:
-                if not pd.isna(latest['macd']) and not pd.isna(latest['macd_signal']):
-                    if latest['macd'] < latest['macd_signal']:
+            if has_macd:
+                if not pd.isna(macd) and not pd.isna(macd_signal):
+                    if macd < macd_signal:
                         reasons.append("MACD bearish")
                         confidence += 15
             
             # Check trend - avoid selling in strong uptrend
-            if 'ema_20' in df.columns and 'ema_50' in df.columns:
-                if not pd.isna(latest['ema_20']) and not pd.isna(latest['ema_50']):
-                    if latest['ema_20'] > latest['ema_50']:
+            if has_ema:
+                if not pd.isna(ema_20) and not pd.isna(ema_50):
+                    if ema_20 > ema_50:
                         confidence -= 20
                         reasons.append("Warning: Uptrend")
             
@@ -205,22 +222,12 @@ class RSIMeanReversionStrategy(BaseStrategy):
         
         # HOLD if no clear signal
         else:
-            reasons.append(f"RSI neutral: {rsi:.1f}")
-            reasons.append(f"BB position: {bb_position:.1f}%")
+            reasons.append(_REASON_NEUTRAL(rsi))
+            reasons.append(_REASON_BB_POSITION(bb_position))
             confidence = 20
         
-        # Calculate stop loss and take profit (convert to float to avoid numpy type issues)
-        stop_loss = None
-        take_profit = None
-        
-        if signal_type == SignalType.BUY:
-            # Fixed percentages: 3% stop loss, 6% take profit
-            stop_loss = float(current_price * 0.97)  # 3% below entry
-            take_profit = float(current_price * 1.06)  # 6% above entry
-        elif signal_type == SignalType.SELL:
-            # For short positions (if implemented later)
-            stop_loss = float(current_price * 1.03)  # 3% above entry
-            take_profit = float(current_price * 0.94)  # 6% below entry
+        # Calculate stop loss and take profit (fixed 3% stop loss, 6% take profit)
+        stop_loss, take_profit = bracket(current_price, signal_type, 0.03, 0.06)
         
         return TradingSignal(
             signal=signal_type,
@@ -19,10 +19,25 @@ Sell Conditions:
 3. Lower TF: MACD bearish crossover or RSI overbought
 4. Volume confirmation
 """
-from strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
+from strategies.base_strategy import (
+    BaseStrategy, TradingSignal, SignalType,
+    HOLD_INSUFFICIENT_DATA
+)
+from strategies._bracket import bracket
 from typing import Dict
+import os
 import pandas as pd
 
+# Attach per-timeframe analysis to HOLD signals only when debugging
+ATTACH_METADATA = os.getenv('ALPHINTRA_DEBUG') == '1'
+
+# Early-exit HOLD signals are shared instances; treat them as read-only
+_HOLD_NO_TIMEFRAMES = TradingSignal(
+    signal=SignalType.HOLD,
+    confidence=0,
+    reason="Required timeframes not available"
+)
+
 
 class MultiTimeframeTrendStrategy(BaseStrategy):
     """
@@ -48,11 +63,7 @@ class MultiTimeframeTrendStrategy(BaseStrategy):
         """Analyze market data using multi-timeframe approach."""
         
         if not self.validate_data(data):
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Insufficient data for analysis"
-            )
+            return HOLD_INSUFFICIENT_DATA
         
         # Identify timeframes
         higher_tf = self._get_higher_timeframe(data)
@@ -60,11 +71,7 @@ class MultiTimeframeTrendStrategy(BaseStrategy):
         lower_tf = self._get_lower_timeframe(data)
         
         if not all([higher_tf, medium_tf, lower_tf]):
-            return TradingSignal(
-                signal=SignalType.HOLD,
-                confidence=0,
-                reason="Required timeframes not available"
-            )
+            return _HOLD_NO_TIMEFRAMES
         
         # Analyze each timeframe
         higher_analysis = self._analyze_higher_tf(data[higher_tf])
@@ -158,11 +165,10 @@ class MultiTimeframeTrendStrategy(BaseStrategy):
     
     def _analyze_lower_tf(self, df: pd.DataFrame) -> Dict:
         """Analyze lower timeframe for entry signals."""
-        if len(df) < 2:
+        if df.shape[0] < 2:
             return {'signal': "NEUTRAL"}
         
         current = df.iloc[-1]
-        previous = df.iloc[-2]
         
         analysis = {
             'signal': "NEUTRAL",
@@ -174,22 +180,17 @@ class MultiTimeframeTrendStrategy(BaseStrategy):
         if 'rsi' in df.columns and not pd.isna(current['rsi']):
             analysis['rsi'] = current['rsi']
         
-        # MACD crossover detection
-        if all(col in df.columns for col in ['macd', 'macd_signal']):
-            if not any(pd.isna([current['macd'], current['macd_signal'],
-                               previous['macd'], previous['macd_signal']])):
-                
-                # Bullish crossover
-                if (previous['macd'] <= previous['macd_signal'] and 
-                    current['macd'] > current['macd_signal']):
-                    analysis['macd_cross'] = "BULLISH"
-                    analysis['signal'] = "BUY"
-                
-                # Bearish crossover
-                elif (previous['macd'] >= previous['macd_signal'] and 
-                      current['macd'] < current['macd_signal']):
-                    analysis['macd_cross'] = "BEARISH"
-                    analysis['signal'] = "SELL"
+        # MACD crossover detection (flags precomputed in TechnicalIndicators.add_macd)
+        if 'macd_cross_up' in df.columns and 'macd_cross_down' in df.columns:
+            # Bullish crossover
+            if df['macd_cross_up'].iat[-1]:
+                analysis['macd_cross'] = "BULLISH"
+                analysis['signal'] = "BUY"
+            
+            # Bearish crossover
+            elif df['macd_cross_down'].iat[-1]:
+                analysis['macd_cross'] = "BEARISH"
+                analysis['signal'] = "SELL"
         
         return analysis
     
@@ -253,16 +254,8 @@ class MultiTimeframeTrendStrategy(BaseStrategy):
                 reasons.append("No clear trend or waiting for confirmation")
             confidence = max(10, confidence)
         
-        # Calculate stop loss and take profit for BUY signals
-        stop_loss = None
-        take_profit = None
-        
-        if signal_type == SignalType.BUY:
-            stop_loss = current_price * 0.97  # 3% stop loss
-            take_profit = current_price * 1.06  # 6% take profit
-        elif signal_type == SignalType.SELL:
-            stop_loss = current_price * 1.03  # 3% stop loss
-            take_profit = current_price * 0.94  # 6% take profit
+        # Calculate stop loss and take profit (3% stop loss, 6% take profit)
+        stop_loss, take_profit = bracket(current_price, signal_type, 0.03, 0.06)
         
         return TradingSignal(
             signal=signal_type,
@@ -275,5 +268,5 @@ class MultiTimeframeTrendStrategy(BaseStrategy):
                 'higher_tf': higher,
                 'medium_tf': medium,
                 'lower_tf': lower
-            }
+            } if ATTACH_METADATA or signal_type != SignalType.HOLD else None
         )
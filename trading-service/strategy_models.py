@@ -5,9 +5,15 @@ Handles strategy data and database operations
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Tuple
 from datetime import datetime
+from contextlib import contextmanager
+import threading
+import time
+import weakref
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
-from psycopg2.extras import RealDictCursor
+import psycopg2.pool
+import orjson
 import os
 from dotenv import load_dotenv
 from logger import setup_logger
@@ -15,12 +21,50 @@ from logger import setup_logger
 # Load environment variables
 load_dotenv()
 
+# Decode json/jsonb columns (strategy parameters) with orjson instead of stdlib json
+psycopg2.extras.register_default_json(loads=orjson.loads, globally=True)
+psycopg2.extras.register_default_jsonb(loads=orjson.loads, globally=True)
+
 logger = setup_logger("StrategyModels", "INFO")
 
 
-@dataclass
+class _TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+    
+    def set(self, key, value):
+        """Store a value, evicting the oldest entry when full"""
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+
+
+@dataclass(slots=True, frozen=True)
 class Strategy:
-    """Strategy data model"""
+    """Strategy data model (immutable; cached instances are shared)"""
     strategy_id: str
     name: str
     description: str
@@ -41,6 +85,8 @@ class Strategy:
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization"""
+        created_at = self.created_at
+        updated_at = self.updated_at
         return {
             'strategy_id': self.strategy_id,
             'name': self.name,
@@ -51,43 +97,142 @@ class Strategy:
             'python_module': self.python_module,
             'strategy_file': self.strategy_file,
             'parameters': self.parameters,
-            'price': float(self.price) if self.price else 0.0,
+            'price': float(self.price or 0),
             'author_id': self.author_id,
             'total_purchases': self.total_purchases,
             'publish_status': self.publish_status,
             'reject_reason': self.reject_reason,
             'created_by': self.created_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None
         }
 
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Strategy':
+        """Build a Strategy from a row whose columns follow the field order above"""
+        (strategy_id, name, description, type_, access_type, python_class,
+         python_module, strategy_file, parameters, price, author_id,
+         total_purchases, publish_status, reject_reason, created_by,
+         created_at, updated_at) = row
+        return cls(
+            strategy_id=strategy_id,
+            name=name,
+            description=description,
+            type=type_,
+            access_type=access_type,
+            python_class=python_class,
+            python_module=python_module,
+            strategy_file=strategy_file,
+            parameters=parameters,
+            price=price,
+            author_id=author_id,
+            total_purchases=total_purchases,
+            publish_status=publish_status,
+            reject_reason=reject_reason,
+            created_by=created_by,
+            created_at=created_at,
+            updated_at=updated_at
+        )
+
+
+class _StrategyConnection(psycopg2.extensions.connection):
+    """Pooled connection that remembers its server-side prepared statements"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def _close_pool_quietly():
+    """Close the shared pool at shutdown; psycopg2/logging may already be torn down"""
+    try:
+        StrategyDB.close_pool()
+    except Exception:
+        pass
+
 
 class StrategyDB:
     """Database operations for strategies"""
     
+    # Connection pool shared by all StrategyDB instances in the process
+    _pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+    _pool_lock = threading.Lock()
+    
+    # Process-wide handle returned by instance()
+    _instance: Optional['StrategyDB'] = None
+    _instance_lock = threading.Lock()
+    
+    # Default strategies and single strategy rows change rarely but are read on
+    # every login / strategy selection; cached per process, cleared on writes
+    _cache_ttl = float(os.getenv("STRATEGY_CACHE_TTL", "60"))
+    _by_id_cache = _TTLCache(_cache_ttl)
+    _defaults_cache = _TTLCache(_cache_ttl, maxsize=1)
+    
     def __init__(self):
-        self.connection = None
         self.connect()
     
+    @classmethod
+    def instance(cls) -> 'StrategyDB':
+        """Return the process-wide StrategyDB, creating it (and the pool) on first use"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+                    weakref.finalize(cls._instance, _close_pool_quietly)
+        return cls._instance
+    
     def connect(self):
-        """Establish database connection"""
+        """Create the shared connection pool on first use"""
+        if StrategyDB._pool is not None:
+            return
+        with StrategyDB._pool_lock:
+            if StrategyDB._pool is not None:
+                return
+            try:
+                StrategyDB._pool = psycopg2.pool.ThreadedConnectionPool(
+                    int(os.getenv("STRATEGY_DB_POOL_MIN", "1")),
+                    int(os.getenv("STRATEGY_DB_POOL_MAX", "10")),
+                    host=os.getenv("DB_HOST", "localhost"),
+                    database=os.getenv("DB_NAME", "alphintra_auth"),  # Strategies stored in auth database
+                    user=os.getenv("DB_USER", "myapp"),
+                    password=os.getenv("DB_PASSWORD", "alphintra123"),
+                    port=os.getenv("DB_PORT", "5432"),
+                    connection_factory=_StrategyConnection
+                )
+                logger.info("Connected to strategy database")
+            except Exception as e:
+                logger.error(f"Failed to connect to strategy database: {e}")
+                raise
+    
+    def _prepare(self, conn, cursor, name: str, query: str, arg_types: str):
+        """PREPARE a server-side statement once per pooled connection"""
+        if name in conn.prepared:
+            return
+        cursor.execute(f"PREPARE {name} ({arg_types}) AS {query}")
+        conn.prepared.add(name)
+    
+    @classmethod
+    def invalidate_cache(cls):
+        """Drop cached strategy reads after any write to the strategies table"""
+        cls._by_id_cache.clear()
+        cls._defaults_cache.clear()
+    
+    @contextmanager
+    def _conn(self):
+        """Borrow a pooled connection; rolls back on error and returns it to the pool"""
+        conn = StrategyDB._pool.getconn()
         try:
-            self.connection = psycopg2.connect(
-                host=os.getenv("DB_HOST", "localhost"),
-                database=os.getenv("DB_NAME", "alphintra_auth"),  # Strategies stored in auth database
-                user=os.getenv("DB_USER", "myapp"),
-                password=os.getenv("DB_PASSWORD", "alphintra123"),
-                port=os.getenv("DB_PORT", "5432")
-            )
-            logger.info("Connected to strategy database")
-        except Exception as e:
-            logger.error(f"Failed to connect to strategy database: {e}")
+            yield conn
+        except Exception:
+            conn.rollback()
             raise
+        finally:
+            StrategyDB._pool.putconn(conn)
     
     def is_user_subscribed(self, user_id: int) -> bool:
         """Returns True if user has an active subscription"""
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT subscription_status, subscription_end_date
                     FROM users WHERE id = %s
@@ -96,7 +241,6 @@ class StrategyDB:
                 if not row:
                     return False
                 status, end_date = row
-                from datetime import datetime
                 return status == 'active' and (end_date is None or end_date > datetime.now())
         except Exception as e:
             logger.error(f"Failed to check subscription: {e}")
@@ -105,7 +249,7 @@ class StrategyDB:
     def count_user_imported_strategies(self, user_id: int) -> int:
         """Count user's imported/created strategies (user_created + marketplace authored)"""
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT COUNT(*) FROM strategies
                     WHERE author_id = %s AND type IN ('user_created', 'marketplace')
@@ -123,7 +267,7 @@ class StrategyDB:
         - Purchased strategies
         """
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT * FROM (
                         -- Get all default strategies (available to everyone)
@@ -190,8 +334,7 @@ class StrategyDB:
                         name
                 """, (user_id, user_id, user_id))
                 
-                rows = cursor.fetchall()
-                strategies = [Strategy(**dict(row)) for row in rows]
+                strategies = [Strategy.from_row(row) for row in cursor]
                 
                 logger.info(f"Retrieved {len(strategies)} strategies for user {user_id}")
                 return strategies
@@ -202,11 +345,16 @@ class StrategyDB:
     
     def get_strategy_by_id(self, strategy_id: str) -> Optional[Strategy]:
         """Get a specific strategy by ID"""
+        cached = StrategyDB._by_id_cache.get(strategy_id)
+        if cached is not None:
+            return cached
+        
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT 
                         strategy_id, name, description, type,
+                        NULL AS access_type,
                         python_class, python_module, strategy_file,
                         parameters, price, author_id, total_purchases,
                         COALESCE(publish_status, 'private') as publish_status,
@@ -218,7 +366,9 @@ class StrategyDB:
                 
                 row = cursor.fetchone()
                 if row:
-                    return Strategy(**dict(row))
+                    strategy = Strategy.from_row(row)
+                    StrategyDB._by_id_cache.set(strategy_id, strategy)
+                    return strategy
                 return None
                 
         except Exception as e:
@@ -227,14 +377,20 @@ class StrategyDB:
     
     def get_default_strategies(self) -> List[Strategy]:
         """Get all default (system-provided) strategies"""
+        cached = StrategyDB._defaults_cache.get('all')
+        if cached is not None:
+            return list(cached)
+        
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT 
                         strategy_id, name, description, type,
+                        NULL AS access_type,
                         python_class, python_module, strategy_file,
                         parameters, price, author_id, total_purchases,
                         COALESCE(publish_status, 'approved') as publish_status,
+                        NULL AS reject_reason,
                         COALESCE(created_by, 'admin') as created_by,
                         created_at, updated_at
                     FROM strategies
@@ -242,9 +398,9 @@ class StrategyDB:
                     ORDER BY name
                 """)
                 
-                rows = cursor.fetchall()
-                strategies = [Strategy(**dict(row)) for row in rows]
+                strategies = [Strategy.from_row(row) for row in cursor]
                 
+                StrategyDB._defaults_cache.set('all', tuple(strategies))
                 logger.info(f"Retrieved {len(strategies)} default strategies")
                 return strategies
                 
@@ -258,7 +414,7 @@ class StrategyDB:
         Should be called during user registration
         """
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     INSERT INTO user_strategies (user_id, strategy_id, access_type)
                     SELECT %s, strategy_id, 'default'
@@ -267,13 +423,12 @@ class StrategyDB:
                     ON CONFLICT (user_id, strategy_id) DO NOTHING
                 """, (user_id,))
                 
-                self.connection.commit()
+                conn.commit()
                 logger.info(f"Granted default strategies to user {user_id}")
                 return True
                 
         except Exception as e:
             logger.error(f"Failed to grant default strategies to user {user_id}: {e}")
-            self.connection.rollback()
             return False
     
     def track_strategy_usage(self, user_id: int, strategy_id: str) -> bool:
@@ -283,25 +438,45 @@ class StrategyDB:
         logger.info(f"Strategy usage tracking called for {strategy_id} by user {user_id} (no-op)")
         return True
     
-    def get_marketplace_strategies(self) -> List[Strategy]:
-        """Get all marketplace strategies (available for purchase)"""
+    def get_marketplace_strategies(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Strategy]:
+        """
+        Get marketplace strategies (available for purchase)
+        
+        Args:
+            limit: Maximum number of strategies to return (None for all)
+            offset: Number of strategies to skip
+        
+        Returns:
+            List of strategies ordered by total purchases, then name
+        """
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("""
+            with self._conn() as conn, conn.cursor() as cursor:
+                self._prepare(conn, cursor, 'get_marketplace_strategies', """
                     SELECT 
                         strategy_id, name, description, type,
+                        NULL AS access_type,
                         python_class, python_module, strategy_file,
                         parameters, price, author_id, total_purchases,
                         COALESCE(publish_status, 'approved') as publish_status,
+                        NULL AS reject_reason,
                         COALESCE(created_by, 'admin') as created_by,
                         created_at, updated_at
                     FROM strategies
                     WHERE type = 'marketplace' AND created_by = 'admin'
                     ORDER BY total_purchases DESC, name
-                """)
+                    LIMIT $1 OFFSET $2
+                """, 'bigint, bigint')
+                # LIMIT NULL returns every row
+                cursor.execute(
+                    "EXECUTE get_marketplace_strategies (%s, %s)",
+                    (limit, offset)
+                )
                 
-                rows = cursor.fetchall()
-                strategies = [Strategy(**dict(row)) for row in rows]
+                strategies = [Strategy.from_row(row) for row in cursor]
                 
                 logger.info(f"Retrieved {len(strategies)} marketplace strategies")
                 return strategies
@@ -314,49 +489,47 @@ class StrategyDB:
         """
         Purchase a marketplace strategy
         Grants user access to the strategy
+        
+        Validation, the access grant and the purchase counter update run as a
+        single statement, so the counter only moves when access is newly granted.
         """
         try:
-            with self.connection.cursor() as cursor:
-                # Check if strategy exists and is purchasable
-                cursor.execute("""
-                    SELECT type, price 
-                    FROM strategies 
-                    WHERE strategy_id = %s
-                """, (strategy_id,))
-                
-                result = cursor.fetchone()
-                if not result:
-                    logger.error(f"Strategy {strategy_id} not found")
-                    return False
-                
-                strategy_type, strategy_price = result
-                
-                if strategy_type != 'marketplace':
-                    logger.error(f"Strategy {strategy_id} is not a marketplace strategy")
-                    return False
-                
-                # Grant access to user
-                cursor.execute("""
-                    INSERT INTO user_strategies 
-                    (user_id, strategy_id, access_type, purchased_at, purchase_price)
-                    VALUES (%s, %s, 'purchased', CURRENT_TIMESTAMP, %s)
-                    ON CONFLICT (user_id, strategy_id) DO NOTHING
-                """, (user_id, strategy_id, price))
-                
-                # Update total purchases
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
+                    WITH purchasable AS (
+                        SELECT strategy_id
+                        FROM strategies
+                        WHERE strategy_id = %s AND type = 'marketplace'
+                    ),
+                    granted AS (
+                        INSERT INTO user_strategies 
+                        (user_id, strategy_id, access_type, purchased_at, purchase_price)
+                        SELECT %s, strategy_id, 'purchased', CURRENT_TIMESTAMP, %s
+                        FROM purchasable
+                        ON CONFLICT (user_id, strategy_id) DO NOTHING
+                        RETURNING strategy_id
+                    )
                     UPDATE strategies 
                     SET total_purchases = total_purchases + 1
-                    WHERE strategy_id = %s
-                """, (strategy_id,))
+                    WHERE strategy_id IN (SELECT strategy_id FROM granted)
+                    RETURNING strategy_id
+                """, (strategy_id, user_id, price))
+                
+                if cursor.fetchone() is None:
+                    conn.rollback()
+                    logger.error(
+                        f"Strategy {strategy_id} not found, not a marketplace strategy, "
+                        f"or already owned by user {user_id}"
+                    )
+                    return False
                 
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"User {user_id} purchased strategy {strategy_id} for ${price}")
                 return True
                 
         except Exception as e:
             logger.error(f"Failed to purchase strategy: {e}")
-            self.connection.rollback()
             return False
     
     def create_strategy(
@@ -391,7 +564,7 @@ class StrategyDB:
             Tuple of (success, error_message)
         """
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     INSERT INTO strategies 
                     (strategy_id, name, description, type, price, python_class, 
@@ -406,17 +579,16 @@ class StrategyDB:
                     author_id
                 ))
                 
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"Created strategy: {strategy_id}")
                 return True, None
                 
         except psycopg2.IntegrityError as e:
             logger.error(f"Strategy already exists: {e}")
-            self.connection.rollback()
             return False, "Strategy with this ID already exists"
         except Exception as e:
             logger.error(f"Failed to create strategy: {e}")
-            self.connection.rollback()
             return False, str(e)
     
     def update_strategy(
@@ -467,7 +639,7 @@ class StrategyDB:
             updates.append("updated_at = CURRENT_TIMESTAMP")
             values.append(strategy_id)
             
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 query = f"""
                     UPDATE strategies 
                     SET {', '.join(updates)}
@@ -476,16 +648,16 @@ class StrategyDB:
                 cursor.execute(query, values)
                 
                 if cursor.rowcount == 0:
-                    self.connection.rollback()
+                    conn.rollback()
                     return False, "Strategy not found"
                 
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"Updated strategy: {strategy_id}")
                 return True, None
                 
         except Exception as e:
             logger.error(f"Failed to update strategy: {e}")
-            self.connection.rollback()
             return False, str(e)
     
     def delete_strategy(self, strategy_id: str) -> Tuple[bool, Optional[str]]:
@@ -499,7 +671,7 @@ class StrategyDB:
             Tuple of (success, error_message)
         """
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 # First, check if strategy exists
                 cursor.execute("""
                     SELECT strategy_file FROM strategies WHERE strategy_id = %s
@@ -514,13 +686,13 @@ class StrategyDB:
                     DELETE FROM strategies WHERE strategy_id = %s
                 """, (strategy_id,))
                 
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"Deleted strategy: {strategy_id}")
                 return True, None
                 
         except Exception as e:
             logger.error(f"Failed to delete strategy: {e}")
-            self.connection.rollback()
             return False, str(e)
     
     def get_all_strategies_admin(self, strategy_type: Optional[str] = None) -> List[Strategy]:
@@ -534,12 +706,14 @@ class StrategyDB:
             List of all strategies
         """
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 if strategy_type:
                     cursor.execute("""
                         SELECT 
-                            strategy_id, name, description, type, python_class,
-                            python_module, strategy_file, parameters, price,
+                            strategy_id, name, description, type,
+                            NULL AS access_type,
+                            python_class, python_module, strategy_file,
+                            parameters, price,
                             author_id, total_purchases,
                             COALESCE(publish_status, 'approved') as publish_status,
                             reject_reason, COALESCE(created_by, 'admin') as created_by,
@@ -551,8 +725,10 @@ class StrategyDB:
                 else:
                     cursor.execute("""
                         SELECT 
-                            strategy_id, name, description, type, python_class,
-                            python_module, strategy_file, parameters, price,
+                            strategy_id, name, description, type,
+                            NULL AS access_type,
+                            python_class, python_module, strategy_file,
+                            parameters, price,
                             author_id, total_purchases,
                             COALESCE(publish_status, 'approved') as publish_status,
                             reject_reason, COALESCE(created_by, 'admin') as created_by,
@@ -561,8 +737,7 @@ class StrategyDB:
                         ORDER BY created_at DESC
                     """)
                 
-                rows = cursor.fetchall()
-                strategies = [Strategy(**dict(row)) for row in rows]
+                strategies = [Strategy.from_row(row) for row in cursor]
                 
                 logger.info(f"Retrieved {len(strategies)} strategies for admin")
                 return strategies
@@ -589,7 +764,7 @@ class StrategyDB:
     ) -> Tuple[bool, Optional[str]]:
         """Create a private user-imported strategy."""
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     INSERT INTO strategies 
                     (strategy_id, name, description, type, price, python_class, 
@@ -603,23 +778,23 @@ class StrategyDB:
                     psycopg2.extras.Json(parameters) if parameters else None,
                     author_id
                 ))
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"Created user strategy: {strategy_id} for user {author_id}")
                 return True, None
         except psycopg2.IntegrityError as e:
-            self.connection.rollback()
             return False, "Strategy with this ID already exists"
         except Exception as e:
-            self.connection.rollback()
             return False, str(e)
 
     def get_all_user_marketplace_strategies(self) -> List[Strategy]:
         """Admin view: all user-submitted strategies approved in the marketplace."""
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT 
                         s.strategy_id, s.name, s.description, s.type,
+                        'created' as access_type,
                         NULL AS python_class, NULL AS python_module,
                         NULL AS strategy_file, NULL AS parameters,
                         s.price, s.author_id, s.total_purchases,
@@ -627,7 +802,6 @@ class StrategyDB:
                         NULL AS reject_reason,
                         COALESCE(s.created_by, 'user') as created_by,
                         s.created_at, s.updated_at,
-                        'created' as access_type,
                         u.email as author_email
                     FROM strategies s
                     LEFT JOIN users u ON u.id = s.author_id
@@ -635,14 +809,10 @@ class StrategyDB:
                       AND s.type = 'marketplace' AND s.publish_status = 'approved'
                     ORDER BY s.total_purchases DESC, s.created_at DESC
                 """)
-                rows = cursor.fetchall()
                 result = []
-                for row in rows:
-                    d = dict(row)
-                    author_email = d.pop('author_email', None)
-                    s = Strategy(**d)
-                    s_dict = s.to_dict()
-                    s_dict['author_email'] = author_email
+                for row in cursor:
+                    s_dict = Strategy.from_row(row[:-1]).to_dict()
+                    s_dict['author_email'] = row[-1]
                     result.append(s_dict)
                 return result
         except Exception as e:
@@ -652,25 +822,24 @@ class StrategyDB:
     def get_user_marketplace_strategies_admin(self, user_id: int) -> List[Strategy]:
         """Admin view: get a user's strategies that are in the marketplace (approved/published)."""
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT 
                         strategy_id, name, description, type,
+                        'created' as access_type,
                         NULL AS python_class, NULL AS python_module,
                         NULL AS strategy_file, NULL AS parameters,
                         price, author_id, total_purchases,
                         COALESCE(publish_status, 'private') as publish_status,
                         NULL AS reject_reason,
                         COALESCE(created_by, 'user') as created_by,
-                        created_at, updated_at,
-                        'created' as access_type
+                        created_at, updated_at
                     FROM strategies
                     WHERE author_id = %s AND created_by = 'user'
                       AND type = 'marketplace' AND publish_status = 'approved'
                     ORDER BY created_at DESC
                 """, (user_id,))
-                rows = cursor.fetchall()
-                return [Strategy(**dict(row)) for row in rows]
+                return [Strategy.from_row(row) for row in cursor]
         except Exception as e:
             logger.error(f"Failed to get user marketplace strategies for admin: {e}")
             return []
@@ -678,22 +847,21 @@ class StrategyDB:
     def get_user_imported_strategies(self, user_id: int) -> List[Strategy]:
         """Get strategies imported/created by a specific user."""
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT 
-                        strategy_id, name, description, type, python_class,
-                        python_module, strategy_file, parameters, price,
-                        author_id, total_purchases,
+                        strategy_id, name, description, type,
+                        'created' as access_type,
+                        python_class, python_module, strategy_file,
+                        parameters, price, author_id, total_purchases,
                         COALESCE(publish_status, 'private') as publish_status,
                         reject_reason, COALESCE(created_by, 'user') as created_by,
-                        created_at, updated_at,
-                        'created' as access_type
+                        created_at, updated_at
                     FROM strategies
                     WHERE author_id = %s AND created_by = 'user'
                     ORDER BY created_at DESC
                 """, (user_id,))
-                rows = cursor.fetchall()
-                return [Strategy(**dict(row)) for row in rows]
+                return [Strategy.from_row(row) for row in cursor]
         except Exception as e:
             logger.error(f"Failed to get user imported strategies: {e}")
             return []
@@ -706,7 +874,7 @@ class StrategyDB:
     ) -> Tuple[bool, Optional[str]]:
         """User requests to publish their strategy to the marketplace."""
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 # Verify ownership
                 cursor.execute("""
                     SELECT strategy_id, publish_status 
@@ -733,29 +901,31 @@ class StrategyDB:
                         updated_at = CURRENT_TIMESTAMP
                     WHERE strategy_id = %s AND author_id = %s
                 """, (price, strategy_id, user_id))
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"Publish request submitted for strategy {strategy_id} by user {user_id}")
                 return True, None
         except Exception as e:
-            self.connection.rollback()
             return False, str(e)
 
     def get_pending_review_strategies(self) -> List[Strategy]:
         """Get all strategies awaiting admin review."""
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     SELECT 
-                        strategy_id, name, description, type, python_class,
-                        python_module, strategy_file, parameters, price,
-                        author_id, total_purchases, publish_status,
-                        reject_reason, created_at, updated_at
+                        strategy_id, name, description, type,
+                        NULL AS access_type,
+                        python_class, python_module, strategy_file,
+                        parameters, price, author_id, total_purchases,
+                        publish_status, reject_reason,
+                        COALESCE(created_by, 'user') as created_by,
+                        created_at, updated_at
                     FROM strategies
                     WHERE publish_status = 'pending_review'
                     ORDER BY updated_at ASC
                 """)
-                rows = cursor.fetchall()
-                return [Strategy(**dict(row)) for row in rows]
+                return [Strategy.from_row(row) for row in cursor]
         except Exception as e:
             logger.error(f"Failed to get pending review strategies: {e}")
             return []
@@ -763,7 +933,7 @@ class StrategyDB:
     def approve_strategy(self, strategy_id: str) -> Tuple[bool, Optional[str]]:
         """Admin approves a pending publish request — moves to marketplace."""
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     UPDATE strategies
                     SET type = 'marketplace',
@@ -774,17 +944,17 @@ class StrategyDB:
                 """, (strategy_id,))
                 if cursor.rowcount == 0:
                     return False, "Strategy not found or not pending review"
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"Strategy approved: {strategy_id}")
                 return True, None
         except Exception as e:
-            self.connection.rollback()
             return False, str(e)
 
     def reject_strategy(self, strategy_id: str, reason: str) -> Tuple[bool, Optional[str]]:
         """Admin rejects a pending publish request."""
         try:
-            with self.connection.cursor() as cursor:
+            with self._conn() as conn, conn.cursor() as cursor:
                 cursor.execute("""
                     UPDATE strategies
                     SET publish_status = 'rejected',
@@ -794,19 +964,18 @@ class StrategyDB:
                 """, (reason, strategy_id))
                 if cursor.rowcount == 0:
                     return False, "Strategy not found or not pending review"
-                self.connection.commit()
+                conn.commit()
+                self.invalidate_cache()
                 logger.info(f"Strategy rejected: {strategy_id} — {reason}")
                 return True, None
         except Exception as e:
-            self.connection.rollback()
             return False, str(e)
     
-    def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
-            logger.info("Closed strategy database connection")
-    
-    def __del__(self):
-        """Cleanup on deletion"""
-        self.close()
+    @classmethod
+    def close_pool(cls):
+        """Close every pooled connection (call on process shutdown)"""
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.closeall()
+                cls._pool = None
+                logger.info("Closed strategy database connection pool")
@@ -5,7 +5,9 @@ Handles uploading, validating, and managing trading strategy files
 import os
 import re
 import ast
+import importlib
 import shutil
+import sys
 from pathlib import Path
 from typing import Optional, Tuple
 from datetime import datetime
@@ -188,6 +190,8 @@ class StrategyUploadHandler:
             # Write file
             with open(target_path, 'wb') as f:
                 f.write(file_content)
+            # Let the next import see the new file instead of a cached directory listing
+            importlib.invalidate_caches()
             
             # Calculate relative path from project root (trading-service directory)
             project_root = Path(__file__).parent
@@ -216,6 +220,8 @@ class StrategyUploadHandler:
 
             if full_path.exists():
                 full_path.unlink()
+                # Drop the cached module so a re-upload under the same name is re-imported
+                sys.modules.pop(self.get_module_path(normalized), None)
                 logger.info(f"Deleted strategy file: {file_path}")
                 return True
             else:
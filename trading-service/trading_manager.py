@@ -1,10 +1,13 @@
 """
 Trading manager for tracking orders, positions, and trade history.
 """
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from bot_models import Order, Position, TradeHistory, BotExecution, get_db
+from sqlalchemy import Float, Numeric, bindparam, case, cast, func, insert, literal, literal_column, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from bot_models import ASYNC_COMMIT, Order, Position, BotExecution, get_db
 import logging
-import uuid
+import secrets
 import os
 import psycopg2
 import json
@@ -12,13 +15,132 @@ import ccxt
 
 logger = logging.getLogger(__name__)
 
+# Hot statements built once with bind parameters; the engine's compiled cache
+# then reuses their SQL and no clause objects are constructed per call.
+# UPDATE bind names carry a b_ prefix because column names are reserved there.
+_FILL_PRICE = bindparam("b_filled_price", type_=Float)
+_FILL_ORDER = (
+    update(Order)
+    .where(Order.order_id == bindparam("b_order_id"))
+    .values(
+        status="FILLED",
+        filled_quantity=Order.quantity,
+        filled_at=bindparam("b_filled_at"),
+        price=func.coalesce(_FILL_PRICE, Order.price),
+        average_price=func.coalesce(_FILL_PRICE, Order.price)
+    )
+    .returning(Order.side, Order.quantity, Order.symbol, Order.average_price)
+    .execution_options(synchronize_session=False)
+)
+
+_UPDATE_POSITIONS_PRICE = (
+    update(Position)
+    .where(Position.user_id == bindparam("b_user_id"), Position.symbol == bindparam("b_symbol"))
+    .values(
+        current_price=bindparam("b_price"),
+        unrealized_pnl=(bindparam("b_price") - Position.entry_price) * Position.quantity
+    )
+    .execution_options(synchronize_session=False)
+)
+
+_CANCEL_ORDER = (
+    update(Order)
+    .where(Order.order_id == bindparam("b_order_id"))
+    .values(status="CANCELLED")
+    .execution_options(synchronize_session=False)
+)
+
+_UPDATE_LAST_RUN = (
+    update(BotExecution)
+    .where(BotExecution.id == bindparam("b_bot_execution_id"))
+    .values(last_run=bindparam("b_last_run"))
+    .execution_options(synchronize_session=False)
+)
+
+# Close or reduce a position and record the trade in one statement. The DELETE and
+# UPDATE branches are mutually exclusive, so exactly one row feeds the INSERT.
+_CLOSE_POSITION = text("""
+    WITH closed AS (
+        DELETE FROM positions
+        WHERE user_id = :user_id AND symbol = :symbol AND quantity <= :quantity
+        RETURNING entry_price, opened_at, 0.0 AS remaining
+    ), reduced AS (
+        UPDATE positions SET quantity = quantity - :quantity
+        WHERE user_id = :user_id AND symbol = :symbol AND quantity > :quantity
+        RETURNING entry_price, opened_at, quantity AS remaining
+    ), position AS (
+        SELECT * FROM closed UNION ALL SELECT * FROM reduced
+    ), trade AS (
+        INSERT INTO trade_history
+            (bot_execution_id, user_id, symbol, buy_price, sell_price,
+             quantity, pnl, result, opened_at, closed_at)
+        SELECT :bot_execution_id, :user_id, :symbol, entry_price, :exit_price,
+               :quantity, (:exit_price - entry_price) * :quantity,
+               CASE WHEN (:exit_price - entry_price) * :quantity > 0 THEN 'PROFIT' ELSE 'LOSS' END,
+               opened_at, :closed_at
+        FROM position
+        RETURNING pnl, result
+    )
+    SELECT trade.pnl, trade.result, position.remaining FROM trade, position
+""")
+
 class TradingManager:
     """Manage trading operations and database tracking."""
     
-    def __init__(self, bot_execution_id: int, user_id: int, environment: str = "testnet"):
+    ORDER_ID_PREFIX = "ORD-"
+    
+    def __init__(self, bot_execution_id: int, user_id: int, environment: str = "testnet", db=None):
         self.bot_execution_id = bot_execution_id
         self.user_id = user_id
         self.environment = environment
+        # One session for the manager's lifetime; its connection goes back to the
+        # pool at each commit/rollback, so holding it between ticks is cheap
+        self.db = db if db is not None else get_db()
+        self._in_tick = False
+        self._refresh_balance = False
+    
+    @contextmanager
+    def tick(self):
+        """
+        Group several manager calls into one transaction committed on exit.
+        
+        Methods called inside skip their own commits and re-raise their errors,
+        so a failing method rolls back everything done so far in the tick.
+        The Binance balance refresh requested by fill_order runs after commit.
+        """
+        self._in_tick = True
+        try:
+            yield self
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self._refresh_balance = False
+            raise
+        finally:
+            self._in_tick = False
+        if self._refresh_balance:
+            self._refresh_balance = False
+            self._sync_balance_from_binance()
+    
+    def _sync_balance_from_binance(self):
+        """Refresh the wallet balance from Binance once no order/position rows are locked."""
+        logger.info("🔄 Fetching latest balance from Binance after trade...")
+        self._fetch_and_update_balance_from_binance()
+    
+    def _commit(self):
+        """Commit now, or leave it to the enclosing tick()."""
+        if not self._in_tick:
+            self.db.commit()
+    
+    def close(self):
+        """Close the manager's database session."""
+        self.db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def _fetch_and_update_balance_from_binance(self) -> bool:
         """Fetch latest balance from Binance and update wallet service database."""
@@ -97,10 +219,10 @@ class TradingManager:
             cur.close()
             conn.close()
             
-            logger.info(f"💰 Updated balance from Binance: {balance_dict}")
+            logger.info("💰 Updated balance from Binance: %s", balance_dict)
             return True
         except Exception as e:
-            logger.error(f"Failed to fetch and update balance from Binance: {str(e)}")
+            logger.error("Failed to fetch and update balance from Binance: %s", e)
             return False
     
     def _update_wallet_balance(self, currency: str, amount_change: float) -> bool:
@@ -128,7 +250,10 @@ class TradingManager:
                 conn.close()
                 return False
             
-            balance_data = result[0] if isinstance(result[0], dict) else json.loads(result[0])
+            # Connections stored before their first balance snapshot may have no balance yet
+            balance_data = result[0] or {}
+            if not isinstance(balance_data, dict):
+                balance_data = json.loads(balance_data)
             
             # Update balance
             current_balance = float(balance_data.get(currency, 0))
@@ -149,10 +274,12 @@ class TradingManager:
             cur.close()
             conn.close()
             
-            logger.info(f"💰 Updated {currency} balance: {current_balance:,.4f} -> {new_balance:,.4f} (change: {amount_change:+,.4f})")
+            # Thousands separators need format specs %-style lacks; skip them when INFO is off
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"💰 Updated {currency} balance: {current_balance:,.4f} -> {new_balance:,.4f} (change: {amount_change:+,.4f})")
             return True
         except Exception as e:
-            logger.error(f"Failed to update wallet balance: {str(e)}")
+            logger.error("Failed to update wallet balance: %s", e)
             return False
     
     def create_order(self, symbol: str, side: str, order_type: str, quantity: float, price: float = None) -> str:
@@ -169,11 +296,12 @@ class TradingManager:
         Returns:
             order_id: Generated order ID
         """
-        db = get_db()
         try:
-            order_id = f"ORD-{uuid.uuid4().hex[:12].upper()}"
+            # 6 random bytes give the same 12 hex chars the uuid4 slice used to
+            order_id = self.ORDER_ID_PREFIX + secrets.token_hex(6).upper()
             
-            order = Order(
+            # Core insert: the row is only written here, so skip building an ORM instance
+            self.db.execute(insert(Order).values(
                 bot_execution_id=self.bot_execution_id,
                 user_id=self.user_id,
                 order_id=order_id,
@@ -183,20 +311,17 @@ class TradingManager:
                 price=price,
                 quantity=quantity,
                 status="PENDING"
-            )
-            
-            db.add(order)
-            db.commit()
-            db.refresh(order)
+            ))
+            self._commit()
             
-            logger.info(f"📝 Created order: {order_id} - {side} {quantity} {symbol} @ {price if price else 'MARKET'}")
+            logger.info("📝 Created order: %s - %s %s %s @ %s", order_id, side, quantity, symbol, price or 'MARKET')
             return order_id
         except Exception as e:
-            logger.error(f"Failed to create order: {str(e)}")
-            db.rollback()
+            logger.error("Failed to create order: %s", e)
+            if self._in_tick:
+                raise
+            self.db.rollback()
             return None
-        finally:
-            db.close()
     
     def partial_fill(self, order_id: str, filled_quantity: float, filled_price: float) -> bool:
         """
@@ -211,54 +336,58 @@ class TradingManager:
         Returns:
             True if order is now completely filled
         """
-        db = get_db()
         try:
-            order = db.query(Order).filter(Order.order_id == order_id).first()
-            if not order:
-                logger.error(f"Order not found: {order_id}")
-                return False
-            
-            # Calculate new average price (weighted average)
-            previous_filled = float(order.filled_quantity or 0)
-            previous_avg_price = float(order.average_price or order.price)
-            
-            new_filled = previous_filled + filled_quantity
-            
-            # Weighted average: (old_qty * old_price + new_qty * new_price) / total_qty
-            new_avg_price = (
-                (previous_filled * previous_avg_price) + (filled_quantity * filled_price)
-            ) / new_filled
+            # One UPDATE; SET expressions see the pre-update row, RETURNING the new one.
+            # Fill math runs in NUMERIC so repeated fills sum exactly (0.1 + 0.2 reaches 0.3)
+            previous_filled = cast(func.coalesce(Order.filled_quantity, 0), Numeric)
+            fill_quantity = cast(literal(filled_quantity), Numeric)
+            new_filled = previous_filled + fill_quantity
+            is_complete = new_filled >= cast(Order.quantity, Numeric)
+            row = self.db.execute(
+                update(Order)
+                .where(Order.order_id == order_id)
+                .values(
+                    # Weighted average: (old_qty * old_price + new_qty * new_price) / total_qty
+                    average_price=(
+                        previous_filled * cast(func.coalesce(Order.average_price, Order.price, 0), Numeric)
+                        + fill_quantity * cast(literal(filled_price), Numeric)
+                    ) / new_filled,
+                    filled_quantity=new_filled,
+                    status=case((is_complete, "FILLED"), else_="PARTIALLY_FILLED"),
+                    filled_at=case((is_complete, datetime.now(timezone.utc)), else_=Order.filled_at)
+                )
+                .returning(Order.filled_quantity, Order.quantity, Order.symbol, Order.average_price, Order.status)
+                .execution_options(synchronize_session=False)
+            ).first()
             
-            # Update order
-            order.filled_quantity = new_filled
-            order.average_price = new_avg_price
+            if not row:
+                logger.error("Order not found: %s", order_id)
+                self._commit()
+                return False
             
-            # Check if completely filled
-            is_complete = new_filled >= order.quantity
+            new_filled, quantity, symbol, new_avg_price, status = row
+            is_complete = status == "FILLED"
             
             if is_complete:
-                order.status = "FILLED"
-                order.filled_at = datetime.now(timezone.utc)
                 logger.info(
-                    f"✅ Order {order_id} FILLED: {new_filled}/{order.quantity} {order.symbol} "
-                    f"@ avg ${new_avg_price:.2f}"
+                    "✅ Order %s FILLED: %s/%s %s @ avg $%.2f",
+                    order_id, new_filled, quantity, symbol, new_avg_price
                 )
             else:
-                order.status = "PARTIALLY_FILLED"
                 logger.info(
-                    f"⚡ Order {order_id} PARTIALLY FILLED: {new_filled}/{order.quantity} {order.symbol} "
-                    f"@ ${filled_price:.2f} (avg ${new_avg_price:.2f})"
+                    "⚡ Order %s PARTIALLY FILLED: %s/%s %s @ $%.2f (avg $%.2f)",
+                    order_id, new_filled, quantity, symbol, filled_price, new_avg_price
                 )
             
-            db.commit()
+            self._commit()
             return is_complete
             
         except Exception as e:
-            logger.error(f"Failed to process partial fill: {str(e)}")
-            db.rollback()
+            logger.error("Failed to process partial fill: %s", e)
+            if self._in_tick:
+                raise
+            self.db.rollback()
             return False
-        finally:
-            db.close()
     
     def fill_order(self, order_id: str, filled_price: float = None, stop_loss: float = None, take_profit: float = None):
         """
@@ -271,182 +400,157 @@ class TradingManager:
             stop_loss: Stop loss price level (for BUY orders)
             take_profit: Take profit price level (for BUY orders)
         """
-        db = get_db()
         try:
-            order = db.query(Order).filter(Order.order_id == order_id).first()
-            if not order:
-                logger.error(f"Order not found: {order_id}")
+            # Mark the order filled and read back what the position logic needs in
+            # one round trip (simulation assumes full fill)
+            row = self.db.execute(_FILL_ORDER, {
+                "b_order_id": order_id,
+                "b_filled_at": datetime.now(timezone.utc),
+                "b_filled_price": filled_price or None
+            }).first()
+            if not row:
+                logger.error("Order not found: %s", order_id)
+                self._commit()
                 return
             
-            # Update order status (simulation assumes full fill)
-            order.status = "FILLED"
-            order.filled_quantity = order.quantity
-            order.filled_at = datetime.now(timezone.utc)
-            if filled_price:
-                order.price = filled_price
-                order.average_price = filled_price
-            else:
-                order.average_price = order.price
-            
-            actual_price = order.average_price
+            side, quantity, symbol, actual_price = row
             
             # Extract base and quote currencies from symbol (e.g., BTC/USDT -> BTC, USDT)
-            base_currency = order.symbol.split('/')[0] if '/' in order.symbol else order.symbol.replace('USDT', '')
-            quote_currency = order.symbol.split('/')[1] if '/' in order.symbol else 'USDT'
+            base_currency = symbol.split('/')[0] if '/' in symbol else symbol.replace('USDT', '')
+            quote_currency = symbol.split('/')[1] if '/' in symbol else 'USDT'
             
             # Handle position logic
-            if order.side == "BUY":
+            if side == "BUY":
                 # Deduct USDT, add crypto
-                usdt_spent = actual_price * order.quantity
+                usdt_spent = actual_price * quantity
                 self._update_wallet_balance(quote_currency, -usdt_spent)  # Deduct USDT
-                self._update_wallet_balance(base_currency, order.quantity)  # Add crypto
+                self._update_wallet_balance(base_currency, quantity)  # Add crypto
                 
                 # Open or add to position
                 # Note: stop_loss and take_profit should be passed from signal context
-                self._open_position(db, order.symbol, actual_price, order.quantity, stop_loss, take_profit)
-            elif order.side == "SELL":
+                self._open_position(symbol, actual_price, quantity, stop_loss, take_profit)
+            elif side == "SELL":
                 # Add USDT, deduct crypto
-                usdt_received = actual_price * order.quantity
+                usdt_received = actual_price * quantity
                 self._update_wallet_balance(quote_currency, usdt_received)  # Add USDT
-                self._update_wallet_balance(base_currency, -order.quantity)  # Deduct crypto
+                self._update_wallet_balance(base_currency, -quantity)  # Deduct crypto
                 
                 # Close or reduce position
-                self._close_position(db, order.symbol, actual_price, order.quantity)
+                self._close_position(symbol, actual_price, quantity)
             
-            # After successful trade, fetch and update balance from Binance
-            logger.info("🔄 Fetching latest balance from Binance after trade...")
-            self._fetch_and_update_balance_from_binance()
+            self._commit()
+            logger.info("✅ Filled order: %s - %s %s %s @ %s", order_id, side, quantity, symbol, actual_price)
             
-            db.commit()
-            logger.info(f"✅ Filled order: {order_id} - {order.side} {order.quantity} {order.symbol} @ {actual_price}")
+            # After successful trade, fetch and update balance from Binance; the HTTP
+            # call must not run while this transaction holds the order/position locks
+            if self._in_tick:
+                self._refresh_balance = True
+            else:
+                self._sync_balance_from_binance()
         except Exception as e:
-            logger.error(f"Failed to fill order: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+            logger.error("Failed to fill order: %s", e)
+            if self._in_tick:
+                raise
+            self.db.rollback()
     
-    def _open_position(self, db, symbol: str, entry_price: float, quantity: float, stop_loss: float = None, take_profit: float = None):
+    def _open_position(self, symbol: str, entry_price: float, quantity: float, stop_loss: float = None, take_profit: float = None):
         """Open a new position or add to existing one."""
-        # Check if position already exists for this user (any bot run)
-        position = db.query(Position).filter(
-            Position.user_id == self.user_id,
-            Position.symbol == symbol
-        ).first()
+        # One position per user and symbol (any bot run): insert it, or average the
+        # entry price into the existing row, which stays with the bot run that opened it
+        stmt = pg_insert(Position).values(
+            bot_execution_id=self.bot_execution_id,
+            user_id=self.user_id,
+            symbol=symbol,
+            entry_price=entry_price,
+            quantity=quantity,
+            current_price=entry_price,
+            stop_loss=stop_loss or None,
+            take_profit=take_profit or None
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Position.user_id, Position.symbol],
+            set_={
+                "entry_price": (
+                    (Position.entry_price * Position.quantity) + (excluded.entry_price * excluded.quantity)
+                ) / (Position.quantity + excluded.quantity),
+                "quantity": Position.quantity + excluded.quantity,
+                "stop_loss": func.coalesce(excluded.stop_loss, Position.stop_loss),
+                "take_profit": func.coalesce(excluded.take_profit, Position.take_profit),
+            }
+        ).returning(Position.entry_price, Position.quantity, literal_column("xmax = 0"))
+        new_entry_price, new_quantity, inserted = self.db.execute(stmt).one()
         
-        if position:
-            # Average entry price for adding to position, update to current bot run
-            total_value = (position.entry_price * position.quantity) + (entry_price * quantity)
-            total_quantity = position.quantity + quantity
-            position.entry_price = total_value / total_quantity
-            position.quantity = total_quantity
-            position.bot_execution_id = self.bot_execution_id
-            if stop_loss:
-                position.stop_loss = stop_loss
-            if take_profit:
-                position.take_profit = take_profit
-            logger.info(f"📈 Added to position: {symbol} - New avg price: ${position.entry_price:.2f}, Qty: {position.quantity}")
-        else:
-            # Create new position
-            position = Position(
-                bot_execution_id=self.bot_execution_id,
-                user_id=self.user_id,
-                symbol=symbol,
-                entry_price=entry_price,
-                quantity=quantity,
-                current_price=entry_price,
-                stop_loss=stop_loss,
-                take_profit=take_profit
-            )
-            db.add(position)
+        if not inserted:
+            logger.info("📈 Added to position: %s - New avg price: $%.2f, Qty: %s", symbol, new_entry_price, new_quantity)
+        elif logger.isEnabledFor(logging.INFO):
             sl_info = f", SL: ${stop_loss:.2f}" if stop_loss else ""
             tp_info = f", TP: ${take_profit:.2f}" if take_profit else ""
-            logger.info(f"📈 Opened position: {symbol} - Entry: ${entry_price:.2f}, Qty: {quantity}{sl_info}{tp_info}")
+            logger.info("📈 Opened position: %s - Entry: $%.2f, Qty: %s%s%s", symbol, entry_price, quantity, sl_info, tp_info)
     
-    def _close_position(self, db, symbol: str, exit_price: float, quantity: float):
+    def _close_position(self, symbol: str, exit_price: float, quantity: float):
         """Close or reduce a position and record trade history."""
-        position = db.query(Position).filter(
-            Position.user_id == self.user_id,
-            Position.symbol == symbol
-        ).first()
+        row = self.db.execute(_CLOSE_POSITION, {
+            "bot_execution_id": self.bot_execution_id,
+            "user_id": self.user_id,
+            "symbol": symbol,
+            "quantity": quantity,
+            "exit_price": exit_price,
+            "closed_at": datetime.now(timezone.utc)
+        }).first()
         
-        if not position:
-            logger.warning(f"Cannot close position: {symbol} - Position not found")
+        if not row:
+            logger.warning("Cannot close position: %s - Position not found", symbol)
             return
         
-        # Calculate PnL
-        pnl = (exit_price - position.entry_price) * quantity
-        result = "PROFIT" if pnl > 0 else "LOSS"
-        
-        # Record trade history
-        trade = TradeHistory(
-            bot_execution_id=self.bot_execution_id,
-            user_id=self.user_id,
-            symbol=symbol,
-            buy_price=position.entry_price,
-            sell_price=exit_price,
-            quantity=quantity,
-            pnl=pnl,
-            result=result,
-            opened_at=position.opened_at,
-            closed_at=datetime.now(timezone.utc)
-        )
-        db.add(trade)
-        
-        # Update or close position
-        if quantity >= position.quantity:
-            # Close entire position
-            db.delete(position)
-            logger.info(f"📉 Closed position: {symbol} - PnL: ${pnl:.2f} ({result})")
+        pnl, result, remaining = row
+        if not remaining:
+            logger.info("📉 Closed position: %s - PnL: $%.2f (%s)", symbol, pnl, result)
         else:
-            # Partial close
-            position.quantity -= quantity
-            logger.info(f"📉 Reduced position: {symbol} - Remaining: {position.quantity}, PnL: ${pnl:.2f} ({result})")
+            logger.info("📉 Reduced position: %s - Remaining: %s, PnL: $%.2f (%s)", symbol, remaining, pnl, result)
     
     def update_positions_price(self, symbol: str, current_price: float):
         """Update current price and unrealized PnL for positions."""
-        db = get_db()
         try:
-            positions = db.query(Position).filter(
-                Position.user_id == self.user_id,
-                Position.symbol == symbol
-            ).all()
-            
-            for position in positions:
-                position.current_price = current_price
-                position.unrealized_pnl = (current_price - position.entry_price) * position.quantity
-            
-            db.commit()
+            # Single UPDATE; PnL is computed by PostgreSQL per row
+            if not self._in_tick:
+                # A standalone price refresh holds no durable writes
+                self.db.execute(ASYNC_COMMIT)
+            self.db.execute(_UPDATE_POSITIONS_PRICE, {
+                "b_user_id": self.user_id,
+                "b_symbol": symbol,
+                "b_price": current_price
+            })
+            self._commit()
         except Exception as e:
-            logger.error(f"Failed to update positions: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+            logger.error("Failed to update positions: %s", e)
+            if self._in_tick:
+                raise
+            self.db.rollback()
     
     def cancel_order(self, order_id: str):
         """Cancel a pending order."""
-        db = get_db()
         try:
-            order = db.query(Order).filter(Order.order_id == order_id).first()
-            if order:
-                order.status = "CANCELLED"
-                db.commit()
-                logger.info(f"❌ Cancelled order: {order_id}")
+            result = self.db.execute(_CANCEL_ORDER, {"b_order_id": order_id})
+            self._commit()
+            if result.rowcount:
+                logger.info("❌ Cancelled order: %s", order_id)
         except Exception as e:
-            logger.error(f"Failed to cancel order: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+            logger.error("Failed to cancel order: %s", e)
+            if self._in_tick:
+                raise
+            self.db.rollback()
     
     def update_bot_last_run(self):
         """Update bot execution last run timestamp."""
-        db = get_db()
         try:
-            bot = db.query(BotExecution).filter(BotExecution.id == self.bot_execution_id).first()
-            if bot:
-                bot.last_run = datetime.now(timezone.utc)
-                db.commit()
+            self.db.execute(_UPDATE_LAST_RUN, {
+                "b_bot_execution_id": self.bot_execution_id,
+                "b_last_run": datetime.now(timezone.utc)
+            })
+            self._commit()
         except Exception as e:
-            logger.error(f"Failed to update bot last run: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+            logger.error("Failed to update bot last run: %s", e)
+            if self._in_tick:
+                raise
+            self.db.rollback()
@@ -1,14 +1,19 @@
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 import ccxt.async_support as ccxt
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
 import os
 import logging
+import time
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
-from database import get_db, create_tables, engine
+from database import get_db, create_tables, engine, SessionLocal
 from models import WalletConnection
 from ccxt.base.errors import AuthenticationError, RequestTimeout, ExchangeNotAvailable, NetworkError, DDoSProtection, RateLimitExceeded
 import jwt
@@ -16,21 +21,27 @@ from cryptography.fernet import Fernet
 import base64
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Alphintra Wallet Service", version="1.0.0")
+app = FastAPI(
+    title="Alphintra Wallet Service",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # JWT Configuration
 JWT_SECRET = os.getenv("JWT_SECRET", "zEseNVzJiNEFsxOKygzayk4hHjSp2UJMzHMwSjWWfqE=")
+# Decoded once; the signing key is constant for the process lifetime
+JWT_KEY = base64.b64decode(JWT_SECRET)
 
 # Encryption Configuration - Use JWT_SECRET as base for encryption key
-ENCRYPTION_KEY = base64.urlsafe_b64encode(base64.b64decode(JWT_SECRET)[:32])
+ENCRYPTION_KEY = base64.urlsafe_b64encode(JWT_KEY[:32])
 cipher_suite = Fernet(ENCRYPTION_KEY)
 
-def encrypt_credential(credential: str) -> bytes:
-    """Encrypt a credential string."""
-    return cipher_suite.encrypt(credential.encode())
+def encrypt_credential(credential: str) -> str:
+    """Encrypt a credential string into a Fernet token (stored as text)."""
+    return cipher_suite.encrypt(credential.encode()).decode()
 
 def decrypt_credential(encrypted_credential: bytes | str) -> str:
     """Decrypt an encrypted credential."""
@@ -61,6 +72,125 @@ def noop_feature_probe(feature_name: str) -> bool:
     return DUMMY_FEATURE_FLAGS.get(feature_name, False)
 
 
+# Coins stored right after connecting: trading pairs and USDT
+INITIAL_BALANCE_COINS = frozenset({'BTC', 'ETH', 'SOL', 'DOGE', 'XRP', 'USDT'})
+
+# Coins reported by /binance/balances: trading pairs and stablecoins
+BALANCE_COINS = frozenset({
+    'BTC', 'ETH', 'SOL', 'DOGE', 'XRP',
+    'USDT', 'USDC', 'BUSD', 'DAI', 'TUSD', 'FDUSD', 'USDE', 'USDP'
+})
+
+
+#
+# Per-user ccxt clients, kept alive so repeat calls reuse the HTTP session and loaded markets.
+#
+EXCHANGE_IDLE_TTL = int(os.getenv("EXCHANGE_IDLE_TTL", "600"))  # Seconds before an idle client is closed
+_EXCHANGE_CACHE: Dict[Tuple[int, str], Tuple[Any, float]] = {}
+# Clients are shared by concurrent requests, so their settings are never changed after
+# creation; calls that need a shorter deadline wrap the call in asyncio.wait_for
+EXCHANGE_TIMEOUT_MS = 60000
+# Clients replaced or dropped from the cache, closed by the evictor once nothing can be using them
+_RETIRED_EXCHANGES: List[Tuple[Any, float]] = []
+
+
+async def _close_exchange(exchange) -> None:
+    """Close a ccxt client, ignoring errors from an already broken session."""
+    try:
+        await exchange.close()
+    except Exception:
+        pass
+
+
+def _retire_exchange(exchange) -> None:
+    """Stop handing out a client without closing it under a request that may still hold it."""
+    _RETIRED_EXCHANGES.append((exchange, time.monotonic()))
+
+
+async def _get_exchange(user_id: int, environment: str, api_key: str, secret_key: str):
+    """Return the cached Binance client for a user/environment, creating it if needed."""
+    key = (user_id, environment)
+    entry = _EXCHANGE_CACHE.get(key)
+    if entry and entry[0].apiKey == api_key and entry[0].secret == secret_key:
+        exchange = entry[0]
+    else:
+        # New user/environment or rotated credentials
+        if entry:
+            _retire_exchange(entry[0])
+        exchange = ccxt.binance({
+            'apiKey': api_key,
+            'secret': secret_key,
+            'enableRateLimit': True,
+            'timeout': EXCHANGE_TIMEOUT_MS,
+        })
+        exchange.set_sandbox_mode(environment == "testnet")
+    _EXCHANGE_CACHE[key] = (exchange, time.monotonic())
+    return exchange
+
+
+def _drop_exchanges(user_id: int) -> None:
+    """Forget every cached client for a user; the evictor closes them later."""
+    for key in [k for k in _EXCHANGE_CACHE if k[0] == user_id]:
+        exchange, _ = _EXCHANGE_CACHE.pop(key)
+        _retire_exchange(exchange)
+
+
+class _TTLCache:
+    """Small in-process cache whose entries expire after ttl seconds (event-loop only, no locking)"""
+
+    MISSING = object()
+
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Any, Tuple[float, Any]] = {}
+
+    def get(self, key):
+        """Return the cached value, or MISSING if absent or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return self.MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return self.MISSING
+        return value
+
+    def set(self, key, value):
+        """Store a value, evicting the oldest entry when full"""
+        if key not in self._data and len(self._data) >= self.maxsize:
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key):
+        """Drop an entry if present"""
+        self._data.pop(key, None)
+
+
+# Connection rows only change on connect/disconnect/errors, so polling endpoints can
+# skip the database for a few seconds; every write path below invalidates the user
+CONNECTION_CACHE_TTL = float(os.getenv("CONNECTION_CACHE_TTL", "5"))
+_status_cache = _TTLCache(CONNECTION_CACHE_TTL)  # user_id -> (status, environment) or None
+
+
+def _invalidate_connection(user_id: int) -> None:
+    """Forget cached connection reads for a user after their connection row changed."""
+    _status_cache.pop(user_id)
+
+
+async def _evict_idle_exchanges() -> None:
+    """Periodically close clients that have not been used, or were retired, over EXCHANGE_IDLE_TTL ago."""
+    while True:
+        await asyncio.sleep(60)
+        cutoff = time.monotonic() - EXCHANGE_IDLE_TTL
+        for key in [k for k, (_, last_used) in _EXCHANGE_CACHE.items() if last_used < cutoff]:
+            exchange, _ = _EXCHANGE_CACHE.pop(key)
+            await _close_exchange(exchange)
+        while _RETIRED_EXCHANGES and _RETIRED_EXCHANGES[0][1] < cutoff:
+            exchange, _ = _RETIRED_EXCHANGES.pop(0)
+            await _close_exchange(exchange)
+
+
 # CORS handled by API Gateway - do not add CORS middleware here
 # app.add_middleware(CORSMiddleware, ...) - DISABLED
 
@@ -68,50 +198,169 @@ def noop_feature_probe(feature_name: str) -> bool:
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on service startup"""
-    create_tables()
-    print("✅ Database tables initialized")
-
-# Add request logging middleware
-@app.middleware("http")
-async def log_requests(request, call_next):
-    print(f"DEBUG: Incoming request: {request.method} {request.url}")
-    print(f"DEBUG: Request headers: {dict(request.headers)}")
-    
-    try:
-        body = await request.body()
-        body_text = body.decode(errors='ignore')
-        if 'apiKey' in body_text or 'secretKey' in body_text:
-            print("DEBUG: Request body: <masked>")
-        else:
-            print(f"DEBUG: Request body: {body_text}")
-        # Make the body available to downstream handlers by overriding receive
-        async def receive():
-            return {"type": "http.request", "body": body}
-        # attach overridden receive so FastAPI can read body again
-        request._receive = receive
-    except Exception as e:
-        print(f"DEBUG: Could not read request body: {e}")
-    
-    response = await call_next(request)
-    print(f"DEBUG: Response status: {response.status_code}")
-    return response
+    await create_tables()
+    logger.info("✅ Database tables initialized")
+    app.state.exchange_evictor = asyncio.create_task(_evict_idle_exchanges())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close cached exchange clients on service shutdown"""
+    app.state.exchange_evictor.cancel()
+    while _EXCHANGE_CACHE:
+        _, (exchange, _) = _EXCHANGE_CACHE.popitem()
+        await _close_exchange(exchange)
+    while _RETIRED_EXCHANGES:
+        exchange, _ = _RETIRED_EXCHANGES.pop()
+        await _close_exchange(exchange)
+
+BODY_LOG_METHODS = frozenset({"POST", "PUT", "PATCH"})
+BODY_LOG_MAX_BYTES = 64 * 1024
+
+# Add request logging middleware (plain ASGI: no per-request task or Request/Response wrapping)
+class RequestLoggingMiddleware:
+    """Log each HTTP request's method, URL, headers, body and response status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not logger.isEnabledFor(logging.DEBUG):
+            await self.app(scope, receive, send)
+            return
+
+        query = scope.get("query_string", b"")
+        url = scope["path"] + ("?" + query.decode("latin-1") if query else "")
+        logger.debug("Incoming request: %s %s", scope["method"], url)
+        headers = dict(scope["headers"])
+        logger.debug(
+            "Request headers: %s",
+            {k.decode("latin-1"): v.decode("latin-1") for k, v in headers.items()}
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                logger.debug("Response status: %s", message["status"])
+            await send(message)
+
+        # Only small request bodies are logged; everything else passes through untouched
+        content_length = headers.get(b"content-length", b"0")
+        if (
+            scope["method"] not in BODY_LOG_METHODS
+            or not content_length.isdigit()
+            or int(content_length) >= BODY_LOG_MAX_BYTES
+        ):
+            await self.app(scope, receive, send_wrapper)
+            return
+
+        # Body chunks are recorded as the handler reads them, never buffered up front
+        body = bytearray()
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                # Chunked uploads carry no content-length, so cap the copy here as well
+                if len(body) < BODY_LOG_MAX_BYTES:
+                    body.extend(message.get("body", b"")[:BODY_LOG_MAX_BYTES - len(body)])
+                if not message.get("more_body", False):
+                    if b"apiKey" in body or b"secretKey" in body:
+                        logger.debug("Request body: <masked>")
+                    else:
+                        logger.debug("Request body: %s", body.decode(errors="ignore"))
+            return message
+
+        await self.app(scope, receive_wrapper, send_wrapper)
+
+BINANCE_BODY_MAX_BYTES = 8 * 1024
+
+class BodySizeLimitMiddleware:
+    """Reject POST bodies to /binance/* larger than the limit with 413 before they are parsed."""
+
+    def __init__(self, app, max_body_size=BINANCE_BODY_MAX_BYTES):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith("/binance/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            if content_length.isdigit() and int(content_length) > self.max_body_size:
+                await self._reject(scope, receive, send)
+                return
+            await self.app(scope, receive, send)
+            return
+
+        # Chunked upload: buffer up to the limit, then replay the body to the app
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            body.extend(message.get("body", b""))
+            if len(body) > self.max_body_size:
+                await self._reject(scope, receive, send)
+                return
+            more_body = message.get("more_body", False)
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": bytes(body), "more_body": False}
+
+        await self.app(scope, replay_receive, send)
+
+    @staticmethod
+    async def _reject(scope, receive, send):
+        response = ORJSONResponse({"detail": "Request body too large"}, status_code=413)
+        await response(scope, receive, send)
+
+app.add_middleware(RequestLoggingMiddleware)
+# Compress large payloads such as balance lists; small health/status bodies go out as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+# Outermost, so oversized bodies are refused before logging or parsing
+app.add_middleware(BodySizeLimitMiddleware)
 
 # Pydantic models for request/response
 class CredentialsResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     apiKey: str
     secretKey: str
 
 class ConnectRequest(BaseModel):
+    # Keys pasted from the Binance console often carry stray whitespace
+    model_config = ConfigDict(extra='forbid', str_strip_whitespace=True)
+
     apiKey: str
     secretKey: str
     environment: str | None = "production"
 
 class Balance(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     asset: str
     free: str
     locked: str
 
+class BalancesResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    balances: List[Balance]
+
 class ConnectionResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     connected: bool
     status: Optional[str] = None
     environment: Optional[str] = None
@@ -123,16 +372,22 @@ SUPPORTED_ENVIRONMENTS = {
     "testnet": {"testnet", "sandbox", "demo"},
 }
 
+# Flat alias -> environment map so normalization is a single dict lookup
+_ENV_LOOKUP = {
+    alias: target
+    for target, aliases in SUPPORTED_ENVIRONMENTS.items()
+    for alias in aliases | {target}
+}
+
 
 def normalize_environment(value: str | None) -> str:
     """Map arbitrary environment inputs to a supported environment value."""
     if not value:
         return "production"
 
-    normalized = value.strip().lower()
-    for target, aliases in SUPPORTED_ENVIRONMENTS.items():
-        if normalized == target or normalized in aliases:
-            return target
+    target = _ENV_LOOKUP.get(value.strip().lower())
+    if target:
+        return target
 
     raise HTTPException(
         status_code=400,
@@ -147,17 +402,20 @@ def get_current_user_id(authorization: Optional[str] = Header(None)) -> int:
     
     try:
         # Remove 'Bearer ' prefix if present
-        token = authorization.replace("Bearer ", "").strip()
+        token = authorization[7:].strip() if authorization.startswith("Bearer ") else authorization.strip()
         
-        # Decode JWT token
-        import base64
-        payload = jwt.decode(token, base64.b64decode(JWT_SECRET), algorithms=["HS256"])
+        # Decode JWT token; verification rejects a missing or null userId claim
+        payload = jwt.decode(token, JWT_KEY, algorithms=["HS256"], options={"require": ["userId"]})
         
-        user_id = payload.get("userId")
+        user_id = payload["userId"]
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token: missing userId")
         
         return int(user_id)
+    except HTTPException:
+        raise
+    except jwt.MissingRequiredClaimError:
+        raise HTTPException(status_code=401, detail="Invalid token: missing userId")
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError as e:
@@ -167,215 +425,217 @@ def get_current_user_id(authorization: Optional[str] = Header(None)) -> int:
 
 @app.get("/")
 async def root():
-    print("DEBUG: Root endpoint called")
+    logger.debug("Root endpoint called")
     return {"message": "Alphintra Wallet Service is running"}
 
 @app.get("/health")
 async def health_check():
-    print("DEBUG: Health check called")
+    logger.debug("Health check called")
     return {"status": "healthy", "service": "wallet-service"}
 
+# Binance statuses that count as an active connection
+ACTIVE_CONNECTION_STATUSES = ('connected', 'warning')
+
+# The user's active Binance connection; endpoints add the user_id clause at call time
+_ACTIVE_BINANCE = (WalletConnection.exchange_name == 'binance', WalletConnection.is_active == True)
+_SELECT_ACTIVE_BINANCE = select(WalletConnection).where(*_ACTIVE_BINANCE).limit(1)
+
+# Strong references so fire-and-forget balance tasks are not garbage collected mid-flight
+_background_tasks: set = set()
+
+
+async def _store_initial_balance(connection_id: int, encrypted_api_key: str, exchange) -> None:
+    """Fetch and store the first balance snapshot of a connection outside the request."""
+    try:
+        logger.debug("Fetching initial balances...")
+        balance_data = await asyncio.wait_for(exchange.fetch_balance(), timeout=30)
+        totals = balance_data.get('total', {}) if isinstance(balance_data, dict) else {}
+        balance_dict = {}
+        for asset, total_amount in totals.items():
+            if not total_amount or asset not in INITIAL_BALANCE_COINS:
+                continue
+            try:
+                total_f = float(total_amount)
+            except (TypeError, ValueError):
+                continue
+            # Skip invalid testnet values (18446 is an overflow/invalid value)
+            if 0 < total_f < 18000:
+                balance_dict[asset] = total_f
+
+        # Stored and stamped even when empty, so the snapshot visibly landed
+        async with SessionLocal() as db:
+            # Skip if the user reconnected with new credentials in the meantime
+            await db.execute(
+                update(WalletConnection)
+                .where(
+                    WalletConnection.id == connection_id,
+                    WalletConnection.encrypted_api_key == encrypted_api_key
+                )
+                .values(balance=balance_dict, last_balance_update=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        logger.debug("Initial balance stored: %s", balance_dict)
+    except Exception as balance_error:
+        # Don't fail connection if balance fetch fails
+        logger.debug("Could not fetch initial balance: %s", balance_error)
+
+
 @app.post("/binance/connect")
 async def connect_to_binance(
     request: ConnectRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    print("DEBUG: connect_to_binance function called successfully")
-    print(f"DEBUG: User ID from token: {user_id}")
-    print(f"DEBUG: Received request type: {type(request)}")
+    logger.debug("connect_to_binance function called successfully")
+    logger.debug("User ID from token: %s", user_id)
+    logger.debug("Received request type: %s", type(request))
     
     try:
         normalized_env = normalize_environment(request.environment)
-        print(f"DEBUG: API Key received: {request.apiKey[:10] if request.apiKey else 'None'}...")
-        print(f"DEBUG: Secret Key length: {len(request.secretKey) if request.secretKey else 'No secret'}")
-        print(f"DEBUG: Requested environment: {normalized_env}")
+        logger.debug("API Key received: %s...", request.apiKey[:10] if request.apiKey else 'None')
+        logger.debug("Secret Key length: %s", len(request.secretKey) if request.secretKey else 'No secret')
+        logger.debug("Requested environment: %s", normalized_env)
         
         # Validate inputs
         if not request.apiKey or not request.secretKey:
-            print("DEBUG: Missing API key or secret key")
+            logger.debug("Missing API key or secret key")
             raise HTTPException(status_code=400, detail="API Key and Secret Key are required")
         
         if len(request.apiKey) < 10 or len(request.secretKey) < 10:
-            print("DEBUG: Keys too short")
+            logger.debug("Keys too short")
             raise HTTPException(status_code=400, detail="API Key and Secret Key seem too short")
         
-        # Check if connection already exists for this user
-        existing_connection = db.query(WalletConnection).filter(
-            WalletConnection.user_id == user_id,
-            WalletConnection.exchange_name == 'binance',
-            WalletConnection.is_active == True
-        ).first()
-        
-        if existing_connection:
-            print("DEBUG: Updating existing connection...")
-            # Update existing connection with encrypted credentials
-            existing_connection.encrypted_api_key = encrypt_credential(request.apiKey)
-            existing_connection.encrypted_secret_key = encrypt_credential(request.secretKey)
-            existing_connection.last_used_at = func.now()
-            existing_connection.connection_status = 'connected'
-            existing_connection.last_error = None
-            existing_connection.exchange_environment = normalized_env
-            existing_connection.updated_at = func.now()
-            connection = existing_connection
-        else:
-             print("DEBUG: Creating new connection...")
-             # Create new connection with encrypted credentials
-             connection = WalletConnection(
-                 user_id=user_id,
-                 exchange_name='binance',
-                 exchange_environment=normalized_env,
-                 encrypted_api_key=encrypt_credential(request.apiKey),
-                 encrypted_secret_key=encrypt_credential(request.secretKey),
-                 connection_name=f"Binance Connection ({datetime.now().strftime('%Y-%m-%d')})",
-                 is_active=True,
-                 connection_status='connected'
-             )
-       
-        # Only add if it's a new connection
-        if not existing_connection:
-            db.add(connection)
-        
         # Validate credentials quickly by performing a lightweight call
-        exchange = ccxt.binance({
-            'apiKey': request.apiKey,
-            'secret': request.secretKey,
-            'enableRateLimit': True,
-            'timeout': 10000,
-        })
-
+        exchange = await _get_exchange(user_id, normalized_env, request.apiKey, request.secretKey)
+        connection_status = 'connected'
+        last_error = None
         try:
-            if normalized_env == "testnet":
-                exchange.set_sandbox_mode(True)
-            else:
-                exchange.set_sandbox_mode(False)
-
-            await exchange.fetch_status()
-            connection.connection_status = 'connected'
-            connection.last_error = None
+            await asyncio.wait_for(exchange.fetch_status(), timeout=10)
         except AuthenticationError as auth_err:
-            connection.connection_status = 'error'
-            connection.last_error = f"AuthenticationError: {auth_err}"
-            db.commit()
-            raise HTTPException(status_code=401, detail="Authentication failed: check API key/secret for the selected environment")
-        except (ExchangeNotAvailable, NetworkError, RequestTimeout) as network_err:
+            connection_status = 'error'
+            last_error = f"AuthenticationError: {auth_err}"
+        except (ExchangeNotAvailable, NetworkError, RequestTimeout, asyncio.TimeoutError) as network_err:
             logger.warning("Binance connectivity issue during connect: %s", network_err)
-            connection.connection_status = 'connected'
-            connection.last_error = f"Connectivity issue during validation: {network_err}"
+            last_error = f"Connectivity issue during validation: {network_err}"
         except Exception as validation_error:
             logger.warning("Unexpected error validating Binance credentials: %s", validation_error)
-            connection.connection_status = 'connected'
-            connection.last_error = str(validation_error)
-
-        db.commit()
-        db.refresh(connection)
-        print(f"DEBUG: Connection stored successfully with ID: {connection.uuid}")
-
-        # Fetch and store initial balances after successful connection
-        # Create a fresh exchange instance for balance fetch
-        balance_exchange = ccxt.binance({
-            'apiKey': request.apiKey,
-            'secret': request.secretKey,
-            'enableRateLimit': True,
-            'timeout': 30000,
-        })
+            last_error = str(validation_error)
+        
+        encrypted_api_key = encrypt_credential(request.apiKey)
+        encrypted_secret_key = encrypt_credential(request.secretKey)
+        
+        # Reconnect updates the existing active connection in place, in one round trip
+        existing_connection_id = select(WalletConnection.id).where(
+            WalletConnection.user_id == user_id, *_ACTIVE_BINANCE
+        ).limit(1).scalar_subquery()
+        result = await db.execute(
+            update(WalletConnection)
+            .where(WalletConnection.id == existing_connection_id)
+            .values(
+                encrypted_api_key=encrypted_api_key,
+                encrypted_secret_key=encrypted_secret_key,
+                last_used_at=func.now(),
+                connection_status=connection_status,
+                last_error=last_error,
+                exchange_environment=normalized_env,
+                updated_at=func.now()
+            )
+            .returning(WalletConnection.id, WalletConnection.uuid)
+        )
+        updated = result.first()
+        
+        if updated:
+            logger.debug("Updated existing connection...")
+            connection_id, connection_uuid = updated
+        else:
+            logger.debug("Creating new connection...")
+            # Create new connection with encrypted credentials; an empty balance until
+            # the first snapshot lands, rather than the model's placeholder default
+            connection = WalletConnection(
+                user_id=user_id,
+                exchange_name='binance',
+                exchange_environment=normalized_env,
+                encrypted_api_key=encrypted_api_key,
+                encrypted_secret_key=encrypted_secret_key,
+                connection_name=f"Binance Connection ({datetime.now().strftime('%Y-%m-%d')})",
+                is_active=True,
+                connection_status=connection_status,
+                last_error=last_error,
+                balance={}
+            )
+            db.add(connection)
+        
+        await db.commit()
+        if not updated:
+            connection_id, connection_uuid = connection.id, connection.uuid
+        _invalidate_connection(user_id)
+        
+        if connection_status == 'error':
+            _drop_exchanges(user_id)
+            raise HTTPException(status_code=401, detail="Authentication failed: check API key/secret for the selected environment")
+        logger.debug("Connection stored successfully with ID: %s", connection_uuid)
+        
+        # The initial balance snapshot is slower than the credential check; store it in the background
+        task = asyncio.create_task(_store_initial_balance(connection_id, encrypted_api_key, exchange))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
         
-        try:
-            print("DEBUG: Fetching initial balances...")
-            if normalized_env == "testnet":
-                balance_exchange.set_sandbox_mode(True)
-            else:
-                balance_exchange.set_sandbox_mode(False)
-                
-            balance_data = await balance_exchange.fetch_balance()
-            totals = balance_data.get('total', {}) if isinstance(balance_data, dict) else {}
-            
-            # Define relevant coins to track
-            RELEVANT_COINS = {
-                # Trading pairs
-                'BTC', 'ETH', 'SOL', 'DOGE', 'XRP',
-                # Stablecoins
-                'USDT'
-            }
-            
-            # Build balance dictionary for database - only relevant coins
-            balance_dict = {}
-            for asset, total_amount in totals.items():
-                # Skip if not a relevant coin
-                if asset not in RELEVANT_COINS:
-                    continue
-                    
-                try:
-                    total_f = float(total_amount or 0)
-                    # Skip invalid testnet values (18446 is an overflow/invalid value)
-                    if total_f > 0 and total_f < 18000:
-                        balance_dict[asset] = total_f
-                except Exception:
-                    continue
-            
-            if balance_dict:
-                import json
-                connection.balance = balance_dict
-                connection.last_balance_update = func.now()
-                db.commit()
-                print(f"DEBUG: Initial balance stored: {balance_dict}")
-            else:
-                print("DEBUG: No balances found to store")
-        except Exception as balance_error:
-            print(f"DEBUG: Could not fetch initial balance: {balance_error}")
-            # Don't fail connection if balance fetch fails
-        finally:
-            try:
-                await balance_exchange.close()
-                await exchange.close()
-            except Exception:
-                pass
-
         success_message = "Successfully connected to Binance"
-        if connection.last_error:
+        if last_error:
             success_message = "Connected to Binance (verification warning)"
         
         return ConnectionResponse(
             connected=True,
-            status=connection.connection_status,
+            status=connection_status,
             message=success_message,
-            environment=connection.exchange_environment
+            environment=normalized_env
         )
         
     except HTTPException as he:
-        print(f"DEBUG: HTTP Exception: {he.detail}")
+        logger.debug("HTTP Exception: %s", he.detail)
         raise he
     except Exception as e:
-        print(f"DEBUG: Unexpected error: {str(e)}")
-        print(f"DEBUG: Error type: {type(e)}")
-        import traceback
-        print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        logger.exception("Unexpected error connecting to Binance: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 @app.get("/binance/connection-status")
 async def get_connection_status(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    print("DEBUG: get_connection_status called")
-    print(f"DEBUG: User ID from token: {user_id}")
+    logger.debug("get_connection_status called")
+    logger.debug("User ID from token: %s", user_id)
     
     try:
-        # Look for active Binance connection
-        connection = db.query(WalletConnection).filter(
-            WalletConnection.user_id == user_id,
-            WalletConnection.exchange_name == 'binance',
-            WalletConnection.is_active == True,
-            WalletConnection.connection_status.in_(('connected', 'warning'))
-        ).first()
+        cached = _status_cache.get(user_id)
+        if cached is not _TTLCache.MISSING:
+            return ConnectionResponse(
+                connected=cached is not None,
+                status=cached[0] if cached else None,
+                environment=cached[1] if cached else None
+            )
+        
+        # Bump last used timestamp of the active Binance connection and read its status
+        result = await db.execute(
+            update(WalletConnection)
+            .where(
+                WalletConnection.user_id == user_id,
+                *_ACTIVE_BINANCE,
+                WalletConnection.connection_status.in_(ACTIVE_CONNECTION_STATUSES)
+            )
+            .values(last_used_at=func.now())
+            .returning(WalletConnection.connection_status, WalletConnection.exchange_environment)
+            .execution_options(synchronize_session=False)
+        )
+        connection = result.first()
         
         connected = connection is not None
-        print(f"DEBUG: Connection status: {connected}")
+        logger.debug("Connection status: %s", connected)
         
         if connection:
-            # Update last used timestamp
-            connection.last_used_at = func.now()
-            db.commit()
+            await db.commit()
+        _status_cache.set(user_id, tuple(connection) if connection else None)
         
         return ConnectionResponse(
             connected=connected,
@@ -384,27 +644,25 @@ async def get_connection_status(
         )
         
     except Exception as e:
-        print(f"DEBUG: Error checking connection status: {str(e)}")
+        logger.error("Error checking connection status: %s", e)
         return ConnectionResponse(connected=False)
 
 @app.get("/balance")
 async def get_user_balance(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
     """
     Get user's wallet balance from database (cached balance, no API call).
     Returns balance for all currencies tracked.
     """
-    print("DEBUG: get_user_balance called (from database)")
-    print(f"DEBUG: User ID from token: {user_id}")
+    logger.debug("get_user_balance called (from database)")
+    logger.debug("User ID from token: %s", user_id)
     
     try:
-        connection = db.query(WalletConnection).filter(
-            WalletConnection.user_id == user_id,
-            WalletConnection.exchange_name == 'binance',
-            WalletConnection.is_active == True
-        ).first()
+        connection = await db.scalar(
+            _SELECT_ACTIVE_BINANCE.where(WalletConnection.user_id == user_id)
+        )
 
         if not connection:
             raise HTTPException(status_code=404, detail="Wallet connection not found")
@@ -420,7 +678,7 @@ async def get_user_balance(
                 'free': str(total)
             })
         
-        print(f"DEBUG: Returning balance from database: {balance}")
+        logger.debug("Returning balance from database: %s", balance)
         return {
             "status": "success",
             "balances": balances,
@@ -429,158 +687,123 @@ async def get_user_balance(
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"DEBUG: Error getting balance from DB: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error getting balance from DB: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get balance: {str(e)}")
 
-@app.get("/binance/balances")
+@app.get("/binance/balances", response_model=BalancesResponse)
 async def get_balances(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    print("DEBUG: get_balances called")
-    print(f"DEBUG: User ID from token: {user_id}")
+    logger.debug("get_balances called")
+    logger.debug("User ID from token: %s", user_id)
     try:
-        connection = db.query(WalletConnection).filter(
+        connection = await db.scalar(_SELECT_ACTIVE_BINANCE.where(
             WalletConnection.user_id == user_id,
-            WalletConnection.exchange_name == 'binance',
-            WalletConnection.is_active == True,
-            WalletConnection.connection_status.in_(('connected', 'warning'))
-        ).first()
+            WalletConnection.connection_status.in_(ACTIVE_CONNECTION_STATUSES)
+        ))
 
         if not connection:
-            print("DEBUG: No active connection found")
+            logger.debug("No active connection found")
             raise HTTPException(status_code=401, detail="Not connected to Binance")
 
-        print("DEBUG: Active connection found, fetching balances...")
+        logger.debug("Active connection found, fetching balances...")
         connection.last_used_at = func.now()
-        db.commit()
+        await db.commit()
 
         # Decrypt stored credentials
         try:
-            print(f"DEBUG: Encrypted API key type: {type(connection.encrypted_api_key)}")
-            print(f"DEBUG: Encrypted secret key type: {type(connection.encrypted_secret_key)}")
+            logger.debug("Encrypted API key type: %s", type(connection.encrypted_api_key))
+            logger.debug("Encrypted secret key type: %s", type(connection.encrypted_secret_key))
             api_key = decrypt_credential(connection.encrypted_api_key)
             secret_key = decrypt_credential(connection.encrypted_secret_key)
-            print(f"DEBUG: Decryption successful, key length: {len(api_key)}")
+            logger.debug("Decryption successful, key length: %s", len(api_key))
         except Exception as decrypt_error:
-            logger.error(f"Failed to decrypt credentials: {decrypt_error}")
-            import traceback
-            print(f"DEBUG: Decryption error traceback: {traceback.format_exc()}")
+            logger.error("Failed to decrypt credentials: %s", decrypt_error, exc_info=True)
             # If decryption fails, the connection needs to be re-established
             raise HTTPException(
                 status_code=401, 
                 detail="Stored credentials are invalid. Please disconnect and reconnect your wallet."
             )
         
-        exchange = ccxt.binance({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-            'timeout': 60000,
-        })
+        # Always enable sandbox mode for testnet
+        environment = "testnet" if (connection.exchange_environment or "").lower() == "testnet" else "production"
+        logger.debug("Using Binance %s environment", environment)
+        exchange = await _get_exchange(user_id, environment, api_key, secret_key)
             
         try:
-
-            # Always enable sandbox mode for testnet
-            if (connection.exchange_environment or "").lower() == "testnet":
-                print("DEBUG: Using Binance testnet environment")
-                exchange.set_sandbox_mode(True)
-            else:
-                print("DEBUG: Using Binance production environment")
-                exchange.set_sandbox_mode(False)
-
             balance_data = await exchange.fetch_balance()
 
             totals = balance_data.get('total', {}) if isinstance(balance_data, dict) else {}
             free = balance_data.get('free', {}) if isinstance(balance_data, dict) else {}
             used = balance_data.get('used', {}) if isinstance(balance_data, dict) else {}
 
-            # Define relevant coins to track
-            RELEVANT_COINS = {
-                # Trading pairs
-                'BTC', 'ETH', 'SOL', 'DOGE', 'XRP',
-                # Stablecoins
-                'USDT', 'USDC', 'BUSD', 'DAI', 'TUSD', 'FDUSD', 'USDE', 'USDP'
-            }
-
-            balances = []
             balance_dict = {}  # For storing in database
-            
             for asset, total_amount in totals.items():
-                # Skip if not a relevant coin
-                if asset not in RELEVANT_COINS:
+                # Skip irrelevant coins and empty balances before any conversion
+                if not total_amount or asset not in BALANCE_COINS:
                     continue
-                    
                 try:
-                    total_f = float(total_amount or 0)
-                except Exception:
-                    total_f = 0.0
-                    
+                    total_f = float(total_amount)
+                except (TypeError, ValueError):
+                    continue
                 # Skip invalid testnet values (18446 is an overflow/invalid value)
-                if total_f > 0 and total_f < 18000:
-                    balances.append({
-                        'asset': asset,
-                        'free': str(free.get(asset, 0)),
-                        'locked': str(used.get(asset, 0))
-                    })
-                    # Store total balance for database
+                if 0 < total_f < 18000:
                     balance_dict[asset] = total_f
 
+            free_get, used_get = free.get, used.get
+            balances = [
+                {'asset': asset, 'free': str(free_get(asset, 0)), 'locked': str(used_get(asset, 0))}
+                for asset in balance_dict
+            ]
+
             # Update balance in database
             try:
-                import json
                 connection.balance = balance_dict
                 connection.last_balance_update = func.now()
-                db.commit()
-                print(f"DEBUG: Updated balance in database (filtered): {balance_dict}")
+                await db.commit()
+                logger.debug("Updated balance in database (filtered): %s", balance_dict)
             except Exception as balance_update_error:
-                print(f"DEBUG: Failed to update balance in database: {balance_update_error}")
+                logger.debug("Failed to update balance in database: %s", balance_update_error)
                 # Don't fail the request if balance update fails
                 pass
 
-            print(f"DEBUG: Returning real balances for connection: {connection.uuid}")
+            logger.debug("Returning real balances for connection: %s", connection.uuid)
             return {"balances": balances}
 
         except AuthenticationError as auth_err:
             connection.connection_status = 'error'
             connection.last_error = f"AuthenticationError: {auth_err}"
-            db.commit()
+            await db.commit()
+            _drop_exchanges(user_id)
             raise HTTPException(status_code=401, detail="Authentication failed: check API key/secret (testnet keys required)")
         except (ExchangeNotAvailable, NetworkError) as net_err:
             connection.connection_status = 'error'
             connection.last_error = f"Network/Exchange error: {net_err}"
-            db.commit()
+            await db.commit()
             raise HTTPException(status_code=503, detail="Binance testnet not reachable right now")
         except (RequestTimeout,) as rt:
             connection.connection_status = 'error'
             connection.last_error = f"RequestTimeout: {rt}"
-            db.commit()
+            await db.commit()
             raise HTTPException(status_code=504, detail="Timeout contacting Binance testnet")
         except (DDoSProtection, RateLimitExceeded) as rl:
             connection.connection_status = 'error'
             connection.last_error = f"RateLimit: {rl}"
-            db.commit()
+            await db.commit()
             raise HTTPException(status_code=429, detail="Rate limit / DDoS protection triggered")
         except Exception as api_error:
             connection.connection_status = 'error'
             connection.last_error = str(api_error)
-            db.commit()
-            import traceback
-            print(f"DEBUG: Traceback fetching balances: {traceback.format_exc()}")
+            await db.commit()
+            logger.exception("Failed to fetch balances from Binance: %s", api_error)
             raise HTTPException(status_code=500, detail=f"Failed to fetch balances: {api_error}")
-        finally:
-            try:
-                await exchange.close()
-            except Exception:
-                pass
     except HTTPException:
+        # Error paths above may have changed connection_status
+        _invalidate_connection(user_id)
         raise
     except Exception as e:
-        import traceback
-        print(f"DEBUG: Error fetching balances: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error fetching balances: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch balances: {str(e)}")
 
         
@@ -596,33 +819,32 @@ async def get_balances(
 
 @app.post("/binance/disconnect")
 async def disconnect_from_binance(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
 ):
-    print("DEBUG: disconnect_from_binance called")
-    print(f"DEBUG: User ID from token: {user_id}")
+    logger.debug("disconnect_from_binance called")
+    logger.debug("User ID from token: %s", user_id)
     
     try:
-        # Find active Binance connections
-        connections = db.query(WalletConnection).filter(
-            WalletConnection.user_id == user_id,
-            WalletConnection.exchange_name == 'binance',
-            WalletConnection.is_active == True
-        ).all()
+        # Deactivate all active Binance connections in one UPDATE
+        result = await db.execute(
+            update(WalletConnection)
+            .where(WalletConnection.user_id == user_id, *_ACTIVE_BINANCE)
+            .values(is_active=False, connection_status='disconnected')
+            .returning(WalletConnection.uuid, WalletConnection.exchange_environment)
+            .execution_options(synchronize_session=False)
+        )
+        disconnected = result.all()
         
         environment = None
-        if connections:
-            print(f"DEBUG: Found {len(connections)} connections to disconnect")
-            # Deactivate all active connections
-            for connection in connections:
-                environment = environment or connection.exchange_environment or "production"
-                connection.is_active = False
-                connection.connection_status = 'disconnected'
-                print(f"DEBUG: Disconnected connection: {connection.uuid}")
-            
-            db.commit()
+        if disconnected:
+            logger.debug("Disconnected %s connections: %s", len(disconnected), [row.uuid for row in disconnected])
+            environment = disconnected[0].exchange_environment or "production"
+            await db.commit()
+            _invalidate_connection(user_id)
+            _drop_exchanges(user_id)
         else:
-            print("DEBUG: No active connections found")
+            logger.debug("No active connections found")
         
         return ConnectionResponse(
             connected=False,
@@ -632,53 +854,66 @@ async def disconnect_from_binance(
         )
         
     except Exception as e:
-        print(f"DEBUG: Error disconnecting: {str(e)}")
-        import traceback
-        print(f"DEBUG: Traceback: {traceback.format_exc()}")
+        logger.exception("Error disconnecting: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to disconnect: {str(e)}")
 
 # The "userId: int" parameter tells FastAPI to expect a URL like "...?userId=1"
 @app.get("/binance/credentials", response_model=CredentialsResponse)
-async def get_binance_credentials(userId: int, db: Session = Depends(get_db)):
+async def get_binance_credentials(userId: int, db: AsyncSession = Depends(get_db)):
     """
     Retrieves the active Binance API key and secret for a SPECIFIC user.
     """
-    print(f"DEBUG: /binance/credentials endpoint called for userId: {userId}")
+    logger.debug("/binance/credentials endpoint called for userId: %s", userId)
     
     try:
         # We no longer use the hardcoded get_current_user_from_db function here.
         # We use the userId passed directly in the URL.
-        connection = db.query(WalletConnection).filter(
+        # Only the two credential columns are needed; skip full ORM object hydration
+        result = await db.execute(select(
+            WalletConnection.encrypted_api_key,
+            WalletConnection.encrypted_secret_key
+        ).where(
             WalletConnection.user_id == userId, # <-- Use the userId from the request
             # WalletConnection.exchange_name == 'binance',
             # WalletConnection.is_active == True,
             # WalletConnection.connection_status == 'connected'
-        ).first()
+        ).limit(1))
+        row = result.first()
 
-        if not connection:
-            print(f"DEBUG: No active Binance connection found for userId: {userId}.")
+        if not row:
+            logger.debug("No active Binance connection found for userId: %s.", userId)
             raise HTTPException(status_code=404, detail=f"Active Binance connection not found for userId: {userId}.")
 
-        api_key = connection.encrypted_api_key
-        secret_key = connection.encrypted_secret_key
+        encrypted_api_key, encrypted_secret_key = row
 
-        print(f"DEBUG: Found credentials for userId: {userId}. Sending API Key starting with: {api_key[:5]}...")
+        logger.debug("Found credentials for userId: %s. Sending API Key starting with: %s...", userId, encrypted_api_key[:5])
         # Decrypt credentials before returning
         try:
-            api_key = decrypt_credential(connection.encrypted_api_key)
-            secret_key = decrypt_credential(connection.encrypted_secret_key)
+            api_key = decrypt_credential(encrypted_api_key)
+            secret_key = decrypt_credential(encrypted_secret_key)
         except Exception as decrypt_error:
-            logger.error(f"Failed to decrypt credentials: {decrypt_error}")
+            logger.error("Failed to decrypt credentials: %s", decrypt_error)
             raise HTTPException(status_code=500, detail="Failed to decrypt stored credentials")
+        
+        return CredentialsResponse(apiKey=api_key, secretKey=secret_key)
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"DEBUG: Error fetching credentials for userId {userId}: {str(e)}")
+        logger.error("Error fetching credentials for userId %s: %s", userId, e)
         raise HTTPException(status_code=500, detail="Internal server error while fetching credentials.")
 
 # ...existing code...
 
 if __name__ == "__main__":
     import uvicorn
-    print("DEBUG: Starting server on port 8011")
-    uvicorn.run(app, host="0.0.0.0", port=8011)
+    logger.info("Starting server on port 8011")
+    # uvloop/httptools are required (not "if available"); per-request access logs are off
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8011,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
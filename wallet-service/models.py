@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, JSON
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -10,6 +10,10 @@ Base = declarative_base()
 class WalletConnection(Base):
     """Store encrypted exchange API credentials"""
     __tablename__ = "wallet_connections"
+    __table_args__ = (
+        # Every endpoint looks up a user's active connection for one exchange
+        Index("ix_wallet_user_exch_active", "user_id", "exchange_name", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, index=True)